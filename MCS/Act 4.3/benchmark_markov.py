@@ -0,0 +1,108 @@
+import glob
+import os
+import random
+import sys
+import time
+
+import numpy as np
+from scipy.sparse import coo_matrix, diags
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mcs.markov import markov_matrix, sparse_cosine
+
+texts_folder = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "Act 4.4", "texts"
+)
+
+SIZES = [1024, 10 * 1024, 100 * 1024, 1024 * 1024, 10 * 1024 * 1024]
+
+
+def loop_markov_matrix(document, vocab):
+    """
+    Reference implementation that counts each bigram in a Python loop.
+
+    Args:
+        document (str): The document to generate the matrix for.
+        vocab (list): The list of words to consider.
+
+    Returns:
+        scipy.sparse.csr_matrix: The len(vocab) x len(vocab) Markov transition matrix.
+    """
+
+    words = document.lower().split()
+    word_to_index = {word: idx for idx, word in enumerate(vocab)}
+
+    rows = []
+    cols = []
+    for i in range(len(words) - 1):
+        word1 = words[i]
+        word2 = words[i + 1]
+
+        if word1 in word_to_index and word2 in word_to_index:
+            rows.append(word_to_index[word1])
+            cols.append(word_to_index[word2])
+
+    m_matrix = coo_matrix(
+        (np.ones(len(rows), dtype=np.float64), (rows, cols)),
+        shape=(len(vocab), len(vocab)),
+    ).tocsr()
+
+    row_sums = np.asarray(m_matrix.sum(axis=1)).ravel()
+    inverse = np.divide(1.0, row_sums, out=np.zeros_like(row_sums), where=row_sums > 0)
+    return diags(inverse) @ m_matrix
+
+
+def build_document(size, words, seed):
+    """
+    Build a document of roughly `size` bytes by sampling words from the texts.
+
+    Args:
+        size (int): The target size in bytes.
+        words (list): The words to sample from.
+        seed (int): Seed for the random generator.
+
+    Returns:
+        str: The generated document.
+    """
+
+    rng = random.Random(seed)
+    average = sum(len(word) + 1 for word in words) / len(words)
+    return " ".join(rng.choices(words, k=max(2, int(size / average))))
+
+
+if __name__ == "__main__":
+    words = []
+    for path in sorted(glob.glob(os.path.join(texts_folder, "*.txt"))):
+        with open(path, "r") as file:
+            words += file.read().split()
+
+    print(
+        f"{'Size':>10} {'Words':>10} {'Loop (s)':>10} {'Vector (s)':>11} "
+        f"{'Speedup':>8} {'Max diff':>10}"
+    )
+    for size in SIZES:
+        doc1 = build_document(size, words, 1)
+        doc2 = build_document(size, words, 2)
+        vocab = list(set(doc1.lower().split() + doc2.lower().split()))
+
+        start = time.perf_counter()
+        loop1 = loop_markov_matrix(doc1, vocab)
+        loop2 = loop_markov_matrix(doc2, vocab)
+        loop_elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        vector1 = markov_matrix(doc1, vocab)
+        vector2 = markov_matrix(doc2, vocab)
+        vector_elapsed = time.perf_counter() - start
+
+        difference = max(
+            abs(loop1 - vector1).max(),
+            abs(loop2 - vector2).max(),
+            abs(sparse_cosine(loop1, loop2) - sparse_cosine(vector1, vector2)),
+        )
+        print(
+            f"{len(doc1):>10} {len(doc1.split()):>10} {loop_elapsed:>10.4f} "
+            f"{vector_elapsed:>11.4f} {loop_elapsed / vector_elapsed:>8.1f} "
+            f"{difference:>10.2e}"
+        )
@@ -0,0 +1,47 @@
+"""
+Text similarity and frequency table tools of the MCS activities.
+
+The modules import only the standard library and NumPy when they are loaded;
+SciPy, scikit-learn, Matplotlib and tabulate are imported by the functions that
+use them, so a process only pays for the techniques it actually runs. The names
+below are loaded from their module on first access, e.g. mcs.markov_matrix.
+
+Command line: python -m mcs {freq,bow,tfidf,compare} [options]
+"""
+
+import importlib
+import os
+
+# Carpeta MCS: las rutas por defecto de los comandos parten de aquí
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_EXPORTS = {
+    "markov_matrix": "markov",
+    "sparse_cosine": "markov",
+    "hashed_markov_vector": "markov",
+    "TfidfIndex": "tfidf",
+    "classify": "similarity",
+    "row_cosine": "similarity",
+    "sparse_entries": "similarity",
+    "shingle_hashes": "minhash",
+    "minhash_signatures": "minhash",
+    "lsh_candidates": "minhash",
+    "SimilarityWriter": "storage",
+    "load_vector": "storage",
+    "content_hash": "storage",
+    "VectorCache": "storage",
+    "read_chunks": "pipeline",
+    "fit_vocabulary": "pipeline",
+    "parallel_map": "pipeline",
+    "ReferenceIndex": "index",
+    "frequency_table": "freq",
+    "stream_frequency_table": "freq",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        return getattr(importlib.import_module("." + _EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
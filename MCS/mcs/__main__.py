@@ -0,0 +1,43 @@
+"""
+Command line entry point: python -m mcs <command> [options].
+
+Only the module of the chosen command is imported, so "python -m mcs <command>
+--help" and short runs do not wait for libraries they do not use.
+"""
+
+import argparse
+import importlib
+import sys
+
+# Comando -> (módulo, descripción)
+COMMANDS = {
+    "freq": ("freq", "frequency tables of data files (Act 4.1)"),
+    "bow": ("bag_of_words", "Bag of Words question similarity (Act 4.2)"),
+    "tfidf": ("tf_idf_markov", "BoW, TF-IDF and Markov question similarity (Act 4.3)"),
+    "compare": ("comparison", "compare texts with BoW, TF-IDF and Markov (Act 4.4)"),
+}
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    parser = argparse.ArgumentParser(
+        prog="python -m mcs",
+        description="MCS text similarity and frequency tables",
+        epilog="commands: "
+        + "; ".join(f"{name}: {help}" for name, (_, help) in COMMANDS.items()),
+    )
+    parser.add_argument("command", choices=COMMANDS, help="the tool to run")
+
+    # El primer argumento que no es opción es el comando; el resto es del comando
+    split = next(
+        (i for i, arg in enumerate(argv) if not arg.startswith("-")), len(argv)
+    )
+    args = parser.parse_args(argv[: split + 1])
+
+    module = importlib.import_module("mcs." + COMMANDS[args.command][0])
+    sys.argv[0] = f"{parser.prog} {args.command}"
+    return module.main(argv[split + 1 :])
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+import argparse
+import os
+
+from . import ROOT
+from .pipeline import Progress, fit_vocabulary, parallel_map, read_chunks
+from .similarity import row_cosine
+from .storage import SimilarityWriter
+
+vectorizer = None
+
+
+def init_worker(corpus_vectorizer):
+    """
+    Set the vectorizer used by score_chunk in a worker process.
+
+    Args:
+        corpus_vectorizer (CountVectorizer): Vectorizer with the vocabulary of the
+                                             whole corpus, or None to fit each pair.
+    """
+    global vectorizer
+    vectorizer = corpus_vectorizer
+
+
+def score_chunk(questions):
+    """
+    Calculate the BoW similarity of a chunk of question pairs.
+
+    Args:
+        questions (list): The (question1, question2) tuples.
+
+    Returns:
+        list: One (values, vectors) tuple per pair, as taken by SimilarityWriter.write.
+    """
+    from sklearn.feature_extraction.text import CountVectorizer
+    from sklearn.metrics.pairwise import cosine_similarity
+
+    rows = []
+    if vectorizer is not None:
+        # Vectorización BoW del bloque con el vocabulario del corpus
+        q1_matrix = vectorizer.transform([q1 for q1, _ in questions])
+        q2_matrix = vectorizer.transform([q2 for _, q2 in questions])
+
+        similarities = row_cosine(q1_matrix, q2_matrix)
+
+        for i, (q1, q2) in enumerate(questions):
+            rows.append(([q1, q2, similarities[i]], [q1_matrix[i], q2_matrix[i]]))
+    else:
+        # Calcular similitudes
+        for q1, q2 in questions:
+            # Vectorización BoW
+            pair_vectorizer = CountVectorizer()
+            vectors = pair_vectorizer.fit_transform([q1, q2])
+            vectors_array = vectors.toarray()
+
+            similarity = cosine_similarity(vectors_array[0:1], vectors_array[1:2])
+
+            rows.append(
+                ([q1, q2, similarity[0][0]], [vectors_array[0], vectors_array[1]])
+            )
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bag of Words question similarity")
+    parser.add_argument(
+        "--corpus",
+        action="store_true",
+        help="fit the vocabulary once over all questions instead of once per pair",
+    )
+    parser.add_argument(
+        "--vectors",
+        default=None,
+        help="write the vectors to this .npz sidecar instead of inline in the CSV",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=1000,
+        help="question pairs read and scored at a time",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="worker processes (0: one per core, default: 1)",
+    )
+    parser.add_argument(
+        "--progress",
+        action="store_true",
+        help="report rows and rows/sec on stderr after each chunk",
+    )
+    args = parser.parse_args(argv)
+
+    input_path = os.path.join(ROOT, "Act 4.2", "questions.csv")
+    progress = Progress(args.progress)
+
+    corpus_vectorizer = None
+    if args.corpus:
+        from sklearn.feature_extraction.text import CountVectorizer
+
+        # Primera pasada: vocabulario de todo el corpus
+        analyzer = CountVectorizer().build_analyzer()
+        vocabulary, _, _ = fit_vocabulary(
+            read_chunks(input_path, args.chunk_size), analyzer
+        )
+        corpus_vectorizer = CountVectorizer(vocabulary=vocabulary)
+
+    # Un solo archivo abierto para toda la salida
+    with SimilarityWriter(
+        os.path.join(ROOT, "similarity.csv"),
+        ["question1", "question2", "cosine_distance"],
+        ["q1_vector", "q2_vector"],
+        args.vectors,
+    ) as writer:
+        chunks = read_chunks(input_path, args.chunk_size)
+        results = parallel_map(
+            score_chunk, chunks, args.jobs, init_worker, (corpus_vectorizer,)
+        )
+        for rows in results:
+            for values, vectors in rows:
+                writer.write(values, vectors)
+
+            progress.update(len(rows))
+    return 0
@@ -0,0 +1,428 @@
+import argparse
+import csv
+import os
+from functools import lru_cache
+
+from . import ROOT
+from .index import ReferenceIndex
+from .markov import (
+    HASHED_FEATURES,
+    hashed_markov_vector,
+    markov_matrix,
+    sparse_cosine,
+)
+from .pipeline import parallel_map
+from .similarity import classify
+from .storage import VectorCache, content_hash
+
+# Textos de la Actividad 4.4
+texts_folder = os.path.join(ROOT, "Act 4.4", "texts")
+
+TECHNIQUES = ("bow", "tfidf", "markov")
+
+
+@lru_cache(maxsize=None)
+def technique_params(technique):
+    """
+    Get the parameters the vectors of a technique depend on, for the cache keys.
+
+    Args:
+        technique (str): "bow", "tfidf" or "markov".
+
+    Returns:
+        dict: The parameters.
+    """
+    if technique == "bow":
+        from sklearn.feature_extraction.text import CountVectorizer
+
+        return CountVectorizer().get_params()
+    if technique == "tfidf":
+        from sklearn.feature_extraction.text import TfidfVectorizer
+
+        return TfidfVectorizer().get_params()
+    return {"tokenizer": "lower().split()"}
+
+
+def pair_vectors(technique, texts):
+    """
+    Vectorize two texts together with one technique.
+
+    Args:
+        technique (str): "bow", "tfidf" or "markov".
+        texts (list): The two texts.
+
+    Returns:
+        scipy.sparse.csr_matrix: One row per text (the flattened Markov matrix
+                                 for "markov").
+    """
+    if technique == "bow":
+        from sklearn.feature_extraction.text import CountVectorizer
+
+        return CountVectorizer().fit_transform(texts)
+    if technique == "tfidf":
+        from sklearn.feature_extraction.text import TfidfVectorizer
+
+        return TfidfVectorizer().fit_transform(texts)
+
+    from scipy.sparse import vstack
+
+    vocab = list(set(texts[0].lower().split() + texts[1].lower().split()))
+    return vstack(
+        [markov_matrix(text, vocab).reshape(1, -1) for text in texts], format="csr"
+    )
+
+
+original_content = None
+original_hash = None
+cache = None
+ngram_params = None
+original_ngram = None
+
+
+def ngram_vector(text, text_hash):
+    """
+    Calculate the hashed n-gram Markov vector of one text, or read it from the
+    cache if it was already calculated with the same parameters. Unlike the other
+    techniques, the vector does not depend on the text it is compared with.
+
+    Args:
+        text (str): The text.
+        text_hash (str): The content_hash of the text.
+
+    Returns:
+        scipy.sparse.csr_matrix: The 1 x n_features vector.
+    """
+    if cache is None:
+        return hashed_markov_vector(text, **ngram_params)
+
+    key = VectorCache.key("ngram", ngram_params, text_hash)
+    vector = cache.get(key)
+    if vector is None:
+        vector = hashed_markov_vector(text, **ngram_params)
+        cache.put(key, vector)
+    return vector
+
+
+def init_worker(
+    content,
+    cache_path=None,
+    cache_bytes=256 * 1024 * 1024,
+    ngram_order=2,
+    ngram_features=HASHED_FEATURES,
+):
+    """
+    Set the original text and open the vector cache in a worker process.
+
+    Args:
+        content (str): The original text.
+        cache_path (str): The SQLite cache file, or None to disable the cache.
+        cache_bytes (int): The maximum size of the cached vectors.
+        ngram_order (int): The order of the hashed n-gram Markov vectors.
+        ngram_features (int): The width of the hashed n-gram Markov vectors.
+    """
+    global original_content, original_hash, cache, ngram_params, original_ngram
+    original_content = content
+    original_hash = content_hash(content)
+    cache = VectorCache(cache_path, cache_bytes) if cache_path else None
+    ngram_params = {"order": ngram_order, "n_features": ngram_features}
+    # El vector del original se calcula una vez por proceso
+    original_ngram = ngram_vector(content, original_hash)
+
+
+def compare(filename):
+    """
+    Compare the original text with one comparison file using BoW, TF-IDF, Markov
+    chains and hashed n-gram Markov vectors.
+
+    Args:
+        filename (str): The comparison file, inside texts_folder.
+
+    Returns:
+        tuple: (filename, cos_bow, cos_tfidf, cos_mark, cos_ngram).
+    """
+    with open(os.path.join(texts_folder, filename), "r") as file:
+        file_content = file.read()
+
+    texts = [original_content, file_content]
+    file_hash = content_hash(file_content)
+
+    vectors = {}
+    for technique in TECHNIQUES:
+        if cache is None:
+            vectors[technique] = pair_vectors(technique, texts)
+            continue
+
+        # Reutilizar los vectores si ninguno de los dos textos cambió
+        key = VectorCache.key(
+            technique, technique_params(technique), original_hash, file_hash
+        )
+        vectors[technique] = cache.get(key)
+        if vectors[technique] is None:
+            vectors[technique] = pair_vectors(technique, texts)
+            cache.put(key, vectors[technique])
+
+    from sklearn.metrics.pairwise import cosine_similarity
+
+    bow_matrix = vectors["bow"]
+    cos_bow = cosine_similarity(bow_matrix[0:1], bow_matrix[1:2])[0][0]
+
+    tfidf_matrix = vectors["tfidf"]
+    cos_tfidf = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0]
+
+    cos_mark = sparse_cosine(vectors["markov"][0], vectors["markov"][1])
+
+    cos_ngram = sparse_cosine(original_ngram, ngram_vector(file_content, file_hash))
+
+    return filename, cos_bow, cos_tfidf, cos_mark, cos_ngram
+
+
+def read_text(path):
+    """
+    Read a text file.
+
+    Args:
+        path (str): The file.
+
+    Returns:
+        str: Its contents.
+    """
+    with open(path, "r") as file:
+        return file.read()
+
+
+def file_stat(path):
+    """
+    Get the size and modification time of a file, which change whenever its
+    contents are rewritten.
+
+    Args:
+        path (str): The file.
+
+    Returns:
+        tuple: (size in bytes, modification time in nanoseconds).
+    """
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def search(
+    index_path,
+    filenames,
+    query_path,
+    k=5,
+    rebuild=False,
+    ngram_order=2,
+    ngram_features=HASHED_FEATURES,
+):
+    """
+    Print the k references most similar to a query with every technique, building
+    and saving the index of the references first if it does not exist or the
+    references changed since it was built. Only the references whose size or
+    modification time differ from those recorded in the index are read and
+    hashed to tell whether they changed.
+
+    Args:
+        index_path (str): The .npz file of the index.
+        filenames (list): The reference files inside texts_folder.
+        query_path (str): The file to search for.
+        k (int): The number of references to print per technique.
+        rebuild (bool): Rebuild the index even if index_path exists.
+        ngram_order (int): The order of the hashed n-gram Markov vectors.
+        ngram_features (int): The width of the hashed n-gram Markov vectors.
+    """
+    paths = [os.path.join(texts_folder, filename) for filename in filenames]
+    # Tamaño y fecha de cada referencia, tomados antes de leerlas
+    stats = [file_stat(path) for path in paths]
+
+    index = None
+    if not rebuild and os.path.exists(index_path):
+        index = ReferenceIndex.load(index_path)
+        if (
+            index.names.tolist() != filenames
+            or set(index.matrices) != set(ReferenceIndex.TECHNIQUES)
+            or index.ngram_order != ngram_order
+            or index.ngram_features != ngram_features
+        ):
+            index = None
+        else:
+            # Solo se leen y se hashean las referencias con otro tamaño o fecha
+            changed = [
+                i for i, stat in enumerate(stats) if tuple(index.stats[i]) != stat
+            ]
+            if any(
+                content_hash(read_text(paths[i])) != index.hashes[i] for i in changed
+            ):
+                index = None
+
+    if index is None:
+        # Vectorizar una sola vez la colección de referencia
+        documents = [read_text(path) for path in paths]
+        index = ReferenceIndex.build(
+            filenames, documents, ngram_order, ngram_features, stats
+        )
+        index.save(index_path)
+
+    with open(query_path, "r") as query_file:
+        query = query_file.read()
+
+    for technique, matches in index.query(query, k).items():
+        print("\n")
+        print(
+            f"{technique}: {os.path.basename(query_path)} vs {len(index.names)} textos"
+        )
+        print("=" * 65)
+        for rank, (name, score) in enumerate(matches, 1):
+            print(f"{rank}. {name}:", score, "->", classify(score))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Compare texts with BoW, TF-IDF, Markov and hashed n-grams"
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="worker processes (0: one per core, default: 1)",
+    )
+    parser.add_argument(
+        "--index",
+        default=None,
+        help="search with the .npz index of the texts (rebuilt when they change)",
+    )
+    parser.add_argument(
+        "--rebuild", action="store_true", help="rebuild the index even if it exists"
+    )
+    parser.add_argument(
+        "--query",
+        default=os.path.join(texts_folder, "original.txt"),
+        help="file searched for with --index (default: the original text)",
+    )
+    parser.add_argument(
+        "-k", "--top-k", type=int, default=5, help="matches shown with --index"
+    )
+    parser.add_argument(
+        "--cache",
+        default=None,
+        help="SQLite file caching the vectors of each pair by content hash",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=256,
+        help="maximum size of the cached vectors in MB (default: 256)",
+    )
+    parser.add_argument(
+        "--order",
+        type=int,
+        default=2,
+        help="words of context of the hashed n-gram Markov technique (default: 2)",
+    )
+    parser.add_argument(
+        "--features",
+        type=int,
+        default=HASHED_FEATURES,
+        help="width of the hashed n-gram Markov vectors (default: 2**20)",
+    )
+    args = parser.parse_args(argv)
+    if args.order < 1:
+        parser.error("--order must be at least 1")
+    if args.features < 1:
+        parser.error("--features must be at least 1")
+
+    # Textos de comparación, en orden alfabético
+    filenames = sorted(
+        filename
+        for filename in os.listdir(texts_folder)
+        if filename != "original.txt" and filename.endswith(".txt")
+    )
+
+    if args.index is not None:
+        search(
+            args.index,
+            filenames,
+            args.query,
+            args.top_k,
+            args.rebuild,
+            args.order,
+            args.features,
+        )
+        return 0
+
+    # Leer texto original
+    with open(os.path.join(texts_folder, "original.txt"), "r") as original_file:
+        original_content = original_file.read()
+
+    # Crear un archivo CSV para almacenar los resultados
+    output_csv = os.path.join(ROOT, "Act 4.4", "comparison_results.csv")
+    with open(output_csv, "w", newline="") as csvfile:
+        csv_writer = csv.writer(csvfile)
+
+        csv_writer.writerow(
+            [
+                "Nombre original",
+                "Nombre similar",
+                "Coseno BOW",
+                "Acertó BOW",
+                "Coseno TFIDF",
+                "Acertó TFIDF",
+                "Coseno Markov",
+                "Acertó Markov",
+                "Coseno N-gramas",
+                "Acertó N-gramas",
+            ]
+        )
+
+        results = parallel_map(
+            compare,
+            filenames,
+            args.jobs,
+            init_worker,
+            (
+                original_content,
+                args.cache,
+                args.cache_size * 1024 * 1024,
+                args.order,
+                args.features,
+            ),
+        )
+        for filename, cos_bow, cos_tfidf, cos_mark, cos_ngram in results:
+            print("\n")
+            print(f"Comparando original.txt con {filename}...")
+            print("=" * 65)
+            print("Cosine Similarity (BoW):", cos_bow, "->", classify(cos_bow))
+            print("Cosine Similarity (TF-IDF):", cos_tfidf, "->", classify(cos_tfidf))
+            print(
+                "Cosine Similarity (Cadenas de Markov):",
+                cos_mark,
+                "->",
+                classify(cos_mark),
+            )
+            print(
+                f"Cosine Similarity (Markov orden {args.order}, hash):",
+                cos_ngram,
+                "->",
+                classify(cos_ngram),
+            )
+
+            acert_bow = cos_bow > 0.8
+            acert_tfidf = cos_tfidf > 0.8
+            acert_markov = cos_mark > 0.8
+            acert_ngram = cos_ngram > 0.8
+
+            csv_writer.writerow(
+                [
+                    "original.txt",
+                    filename,
+                    cos_bow,
+                    acert_bow,
+                    cos_tfidf,
+                    acert_tfidf,
+                    cos_mark,
+                    acert_markov,
+                    cos_ngram,
+                    acert_ngram,
+                ]
+            )
+    return 0
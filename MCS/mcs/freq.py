@@ -0,0 +1,468 @@
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import reduce
+import argparse
+import csv
+import glob
+import json
+import math
+import os
+import time
+import numpy as np
+
+from . import ROOT
+
+# Valores clasificados por bloque (acota la memoria temporal con archivos enormes)
+BLOCK_SIZE = 1 << 22
+
+
+# Bytes leídos por bloque en el modo por flujo
+CHUNK_BYTES = 1 << 24
+
+
+def read_value_chunks(paths, chunk_size=CHUNK_BYTES):
+    """
+    Read data files with one number per line in chunks, so files larger than
+    memory can be processed. Each chunk is a block of raw bytes cut at its last
+    newline and parsed with a single NumPy conversion.
+
+    Args:
+        paths (list): The files to read, one after the other.
+        chunk_size (int): The number of bytes read at a time.
+
+    Yields:
+        numpy.ndarray: The float64 values of each chunk.
+    """
+    for path in paths:
+        with open(path, "rb") as file:
+            rest = b""
+            block = file.read(chunk_size)
+            while block:
+                block = rest + block
+                cut = block.rfind(b"\n") + 1
+                rest = block[cut:]
+                values = np.array(block[:cut].split(), dtype=np.float64)
+                if len(values):
+                    yield values
+                block = file.read(chunk_size)
+
+            # Última línea sin salto de línea
+            values = np.array(rest.split(), dtype=np.float64)
+            if len(values):
+                yield values
+
+
+def summarize(data):
+    """
+    Summarize a set of values for the layout of a frequency table.
+
+    Args:
+        data (numpy.ndarray): The values.
+
+    Returns:
+        tuple: (n, min, max).
+    """
+    return len(data), float(data.min()), float(data.max())
+
+
+def merge_summaries(a, b):
+    """
+    Merge the summaries of two sets of values (chunks or files).
+
+    Args:
+        a (tuple): (n, min, max) of the first set.
+        b (tuple): (n, min, max) of the second set.
+
+    Returns:
+        tuple: (n, min, max) of both sets together.
+    """
+    return a[0] + b[0], min(a[1], b[1]), max(a[2], b[2])
+
+
+def table_layout(summary, decimals):
+    """
+    Lay out the intervals of a frequency table with Sturges' rule.
+
+    The number of intervals is c = ceil(1 + 3.3 * log10(n)), the min, max and width
+    are rounded to `decimals`, and the intervals are [min + k * w, min + (k + 1) * w).
+
+    Args:
+        summary (tuple): (n, min, max) of the values.
+        decimals (int): The decimals used to round the min, max and width.
+
+    Returns:
+        dict: n, c, min, max, w, edges (numpy.ndarray with the c + 1 interval
+              bounds) and intervals (list of (start, end) tuples).
+    """
+    n, min_data, max_data = summary
+    c = math.ceil(1 + 3.3 * math.log10(n))
+
+    max_value = round(max_data, decimals)
+    min_value = round(min_data, decimals)
+
+    w = round((max_value - min_value) / c, decimals)
+
+    edges = min_value + np.arange(c + 1) * w
+    return {
+        "n": n,
+        "c": c,
+        "min": min_value,
+        "max": max_value,
+        "w": w,
+        "edges": edges,
+        "intervals": list(zip(edges[:-1].tolist(), edges[1:].tolist())),
+    }
+
+
+def count_bins(data, edges):
+    """
+    Count the values in each interval [edges[k], edges[k + 1]) in one
+    np.searchsorted per block. Values left outside the first or last interval by
+    the rounding of the edges (the max always is) are counted in that interval.
+
+    Counts of different chunks or files over the same edges merge exactly by
+    adding them.
+
+    Args:
+        data (numpy.ndarray): The values.
+        edges (numpy.ndarray): The interval bounds, from table_layout.
+
+    Returns:
+        numpy.ndarray: One count per interval.
+    """
+    c = len(edges) - 1
+    frequencies = np.zeros(c, dtype=np.int64)
+    for start in range(0, len(data), BLOCK_SIZE):
+        block = data[start : start + BLOCK_SIZE]
+        # Intervalo de cada valor, recortado a los extremos
+        bins = np.clip(np.searchsorted(edges, block, side="right") - 1, 0, c - 1)
+        frequencies += np.bincount(bins, minlength=c)
+    return frequencies
+
+
+def frequency_table(data, decimals):
+    """
+    Build the frequency table of a set of values held in memory.
+
+    Args:
+        data (numpy.ndarray): The values.
+        decimals (int): The decimals used to round the min, max and width.
+
+    Returns:
+        dict: The table_layout of the values plus frequencies (numpy.ndarray
+              with one count per interval, adding up to n).
+    """
+    data = np.asarray(data, dtype=np.float64)
+    table = table_layout(summarize(data), decimals)
+    table["frequencies"] = count_bins(data, table["edges"])
+    return table
+
+
+def stream_frequency_table(paths, decimals, chunk_size=CHUNK_BYTES):
+    """
+    Build the frequency table of one or more data files in two streaming passes:
+    the first merges the (n, min, max) of every chunk to lay out the intervals and
+    the second adds up the per-chunk counts. Only one chunk is in memory at a time
+    and the result is identical to frequency_table over all the values.
+
+    Args:
+        paths (list): The files, with one number per line.
+        decimals (int): The decimals used to round the min, max and width.
+        chunk_size (int): The number of bytes read at a time.
+
+    Returns:
+        dict: Same as frequency_table. A ValueError is raised if the files hold
+              no values.
+    """
+    summaries = map(summarize, read_value_chunks(paths, chunk_size))
+    first = next(summaries, None)
+    if first is None:
+        raise ValueError(f"no values in {', '.join(paths)}")
+    table = table_layout(reduce(merge_summaries, summaries, first), decimals)
+
+    frequencies = np.zeros(table["c"], dtype=np.int64)
+    for chunk in read_value_chunks(paths, chunk_size):
+        frequencies += count_bins(chunk, table["edges"])
+    table["frequencies"] = frequencies
+    return table
+
+
+def print_table(title, table):
+    import tabulate
+
+    intervals = table["intervals"]
+    frequencies = table["frequencies"].tolist()
+
+    print()
+    print(title)
+    print(f"N: {table['n']}")
+    print(f"C: {table['c']}")
+    print(f"Max: {table['max']}, Min: {table['min']}")
+    print(f"W: {table['w']}")
+    print()
+    print(
+        tabulate.tabulate(
+            zip(intervals, frequencies),
+            headers=["Interval", "Frequency"],
+            tablefmt="grid",
+        )
+    )
+    print()
+    print("Sum of Frequencies:", sum(frequencies))
+    print()
+
+
+def plot_table(title, table):
+    import matplotlib.pyplot as plt
+
+    plt.bar(
+        [f"{interval[0]} - {interval[1]}" for interval in table["intervals"]],
+        table["frequencies"].tolist(),
+    )
+    plt.xlabel("Interval")
+    plt.ylabel("Frequency")
+    plt.title(title)
+    plt.show()
+
+
+def expand_paths(patterns):
+    """
+    Expand files and glob patterns into a list of files, in the given order.
+
+    Args:
+        patterns (list): Files or globs; a pattern without matches is kept as is,
+                         so the missing file is reported.
+
+    Returns:
+        list: The unique file paths.
+    """
+    files = []
+    for pattern in patterns:
+        files.extend(sorted(glob.glob(pattern, recursive=True)) or [pattern])
+    return list(dict.fromkeys(files))
+
+
+def save_table(table, name, output, chart_format="png"):
+    """
+    Write a frequency table as <name>.csv and <name>.json, and its bar chart as
+    <name>.<chart_format>, without an interactive matplotlib backend.
+
+    Args:
+        table (dict): The output of frequency_table or stream_frequency_table.
+        name (str): The base name of the files.
+        output (str): The folder to write to.
+        chart_format (str): "png" or "svg".
+    """
+    from matplotlib.figure import Figure
+
+    frequencies = table["frequencies"].tolist()
+    base = os.path.join(output, name)
+
+    with open(base + ".csv", "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(["interval_start", "interval_end", "frequency"])
+        for (start, end), frequency in zip(table["intervals"], frequencies):
+            writer.writerow([start, end, frequency])
+
+    with open(base + ".json", "w") as file:
+        json.dump(
+            {
+                "n": table["n"],
+                "c": table["c"],
+                "min": table["min"],
+                "max": table["max"],
+                "w": table["w"],
+                "intervals": table["intervals"],
+                "frequencies": frequencies,
+            },
+            file,
+            indent=2,
+        )
+
+    # Figure sin pyplot: no depende del backend ni de una pantalla
+    figure = Figure(figsize=(max(6.4, 0.9 * table["c"]), 4.8))
+    axes = figure.subplots()
+    axes.bar(
+        [f"{interval[0]} - {interval[1]}" for interval in table["intervals"]],
+        frequencies,
+    )
+    axes.set_xlabel("Interval")
+    axes.set_ylabel("Frequency")
+    axes.set_title(name)
+    axes.tick_params(axis="x", labelrotation=45)
+    figure.tight_layout()
+    figure.savefig(base + "." + chart_format, format=chart_format)
+
+
+def profile_file(
+    path, name, output, decimals=4, chart_format="png", chunk_size=CHUNK_BYTES
+):
+    """
+    Build and save the frequency table of one data file.
+
+    Args:
+        path (str): The data file.
+        name (str): The base name of the output files.
+        output (str): The folder to write to.
+        decimals (int): The decimals used to round the min, max and width.
+        chart_format (str): "png" or "svg".
+        chunk_size (int): The number of bytes read at a time.
+
+    Returns:
+        tuple: (path, table, error message or None).
+    """
+    try:
+        table = stream_frequency_table([path], decimals, chunk_size)
+        save_table(table, name, output, chart_format)
+    except Exception as error:
+        return path, None, f"{type(error).__name__}: {error}"
+    return path, table, None
+
+
+def run_batch(
+    paths, output, jobs=None, decimals=4, chart_format="png", chunk_size=CHUNK_BYTES
+):
+    """
+    Build the frequency tables of many data files, each in a worker process. The
+    CSV, JSON and chart of every file are written to the output folder, plus a
+    summary.csv with one row per file that succeeded.
+
+    Args:
+        paths (list): Data files or glob patterns.
+        output (str): The folder to write to.
+        jobs (int): Worker processes (None: one per core).
+        decimals (int): The decimals used to round the min, max and width.
+        chart_format (str): "png" or "svg".
+        chunk_size (int): The number of bytes read at a time.
+
+    Returns:
+        int: The number of files that could not be processed.
+    """
+    files = expand_paths(paths)
+    os.makedirs(output, exist_ok=True)
+
+    # Nombres de salida únicos aunque dos archivos se llamen igual
+    seen = Counter()
+    names = []
+    for path in files:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        seen[stem] += 1
+        names.append(stem if seen[stem] == 1 else f"{stem}-{seen[stem]}")
+
+    tables = {}
+    failed = 0
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [
+            executor.submit(
+                profile_file, path, name, output, decimals, chart_format, chunk_size
+            )
+            for path, name in zip(files, names)
+        ]
+        for future in as_completed(futures):
+            path, table, error = future.result()
+            if error is not None:
+                print(f"{path}: {error}")
+                failed += 1
+            else:
+                print(f"{path}: N={table['n']}, C={table['c']}")
+                tables[path] = table
+    elapsed = time.perf_counter() - start
+
+    with open(os.path.join(output, "summary.csv"), "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(["file", "name", "n", "c", "min", "max", "w"])
+        for path, name in zip(files, names):
+            if path in tables:
+                table = tables[path]
+                writer.writerow(
+                    [
+                        path,
+                        name,
+                        table["n"],
+                        table["c"],
+                        table["min"],
+                        table["max"],
+                        table["w"],
+                    ]
+                )
+
+    print()
+    print(f"Files: {len(files)}, with errors: {failed}")
+    print(f"{len(files) / elapsed:.1f} files/sec")
+    return failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Frequency tables")
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        help="data files or globs, one number per line (default: the three Act 4.1 "
+        "files)",
+    )
+    parser.add_argument(
+        "--decimals",
+        type=int,
+        default=None,
+        help="decimals of min, max and width (default: 4, 2, 3 for the Act 4.1 files "
+        "and 4 otherwise)",
+    )
+    parser.add_argument(
+        "--merge",
+        action="store_true",
+        help="build a single table over all the files",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=CHUNK_BYTES,
+        help="bytes read at a time (default: 16 MB)",
+    )
+    parser.add_argument(
+        "--output",
+        default=None,
+        help="batch mode: write CSV, JSON and charts for every file to this folder "
+        "instead of printing and showing them",
+    )
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=None, help="worker processes in batch mode"
+    )
+    parser.add_argument(
+        "--format",
+        choices=["png", "svg"],
+        default="png",
+        help="chart format in batch mode",
+    )
+    args = parser.parse_args(argv)
+
+    if args.output is not None:
+        failed = run_batch(
+            args.paths,
+            args.output,
+            args.jobs,
+            4 if args.decimals is None else args.decimals,
+            args.format,
+            args.chunk_size,
+        )
+        return 1 if failed else 0
+
+    files = args.paths or [
+        os.path.join(ROOT, "Act 4.1", "data01.txt"),
+        os.path.join(ROOT, "Act 4.1", "data02.txt"),
+        os.path.join(ROOT, "Act 4.1", "data03.txt"),
+    ]
+    decimals = [4, 2, 3] if not args.paths else [4] * len(files)
+    if args.decimals is not None:
+        decimals = [args.decimals] * len(files)
+
+    if args.merge:
+        table = stream_frequency_table(files, decimals[0], args.chunk_size)
+        print_table("Data Files: " + ", ".join(files), table)
+        plot_table("Data Files", table)
+    else:
+        for i, file in enumerate(files):
+            table = stream_frequency_table([file], decimals[i], args.chunk_size)
+            print_table(f"Data File: {i + 1}", table)
+            plot_table(f"Data File {i + 1}", table)
+    return 0
@@ -0,0 +1,301 @@
+import numpy as np
+from collections import ChainMap, Counter
+
+from .markov import HASHED_FEATURES, hashed_markov_vector, markov_matrix
+from .storage import content_hash
+from .tfidf import TfidfIndex
+
+
+class ReferenceIndex:
+    """
+    One-vs-many search over a collection of reference documents.
+
+    The references are vectorized once into one sparse matrix per technique, with
+    L2-normalized rows, so a query is answered with a single sparse matrix-vector
+    product per technique followed by a top-k selection:
+
+        bow: word counts over the vocabulary of the references.
+        tfidf: the same counts weighted by the idf of the references.
+        markov: the Markov matrix of every document over the words of the
+                references, flattened into a single row and keeping only the
+                columns (word transitions) that appear in some reference.
+        ngram: the hashed k-th order Markov vector of every document.
+
+    BoW, Markov and n-gram scores equal those of comparing the query with each
+    reference on its own; TF-IDF scores use the idf of the whole reference
+    collection. Next to the content hash of every reference the index keeps the
+    (size, mtime_ns) it had when it was read, so a caller can tell which files
+    need to be hashed again to check that the index is up to date.
+    """
+
+    TECHNIQUES = ("bow", "tfidf", "markov", "ngram")
+
+    def __init__(
+        self,
+        names,
+        hashes,
+        vocabulary,
+        idf,
+        markov_vocabulary,
+        markov_columns,
+        matrices,
+        ngram_order=2,
+        ngram_features=HASHED_FEATURES,
+        stats=None,
+    ):
+        self.names = np.asarray(names, dtype=str)
+        self.hashes = np.asarray(hashes, dtype=str)
+        # (tamaño, mtime_ns) de cada referencia; ceros si no se conocen
+        self.stats = (
+            np.zeros((len(self.names), 2), dtype=np.int64)
+            if stats is None
+            else np.asarray(stats, dtype=np.int64).reshape(-1, 2)
+        )
+        self.vocabulary = np.asarray(vocabulary, dtype=str)
+        self.markov_vocabulary = np.asarray(markov_vocabulary, dtype=str)
+        self.markov_columns = np.asarray(markov_columns, dtype=np.int64)
+        self.matrices = matrices
+        self.ngram_order = int(ngram_order)
+        self.ngram_features = int(ngram_features)
+
+        from sklearn.feature_extraction.text import CountVectorizer, TfidfTransformer
+
+        self.bow_vectorizer = CountVectorizer(
+            vocabulary={term: i for i, term in enumerate(self.vocabulary.tolist())}
+        )
+        self.tfidf_transformer = TfidfTransformer()
+        self.tfidf_transformer.idf_ = np.asarray(idf)
+        self.markov_words = self.markov_vocabulary.tolist()
+        self.word_to_index = {word: i for i, word in enumerate(self.markov_words)}
+
+    @classmethod
+    def build(
+        cls,
+        names,
+        documents,
+        ngram_order=2,
+        ngram_features=HASHED_FEATURES,
+        stats=None,
+    ):
+        """
+        Vectorize a collection of reference documents.
+
+        Args:
+            names (list): The name of each document.
+            documents (list): The text of each document.
+            ngram_order (int): The order of the hashed Markov vectors.
+            ngram_features (int): The width of the hashed Markov vectors.
+            stats (list): The (size, mtime_ns) of each document's file, if any.
+
+        Returns:
+            ReferenceIndex: The index.
+        """
+        from scipy.sparse import csr_matrix, vstack
+        from sklearn.preprocessing import normalize
+
+        # Índice invertido de las referencias: conteos, vocabulario e idf
+        tfidf_index = TfidfIndex(documents)
+        counts = tfidf_index.counts()
+
+        markov_vocabulary = sorted(
+            set(word for document in documents for word in document.lower().split())
+        )
+        word_to_index = {word: i for i, word in enumerate(markov_vocabulary)}
+        markov = vstack(
+            [
+                markov_matrix(document, markov_vocabulary, word_to_index).reshape(1, -1)
+                for document in documents
+            ],
+            format="csr",
+        )
+        # Quedarse solo con las transiciones que aparecen en alguna referencia
+        markov_columns = np.unique(markov.indices.astype(np.int64))
+        markov = csr_matrix(
+            (
+                markov.data,
+                np.searchsorted(markov_columns, markov.indices),
+                markov.indptr,
+            ),
+            shape=(len(documents), len(markov_columns)),
+        )
+        # Normalizar cada fila (L2); las filas vacías se quedan en cero
+        rows = np.repeat(np.arange(len(documents)), np.diff(markov.indptr))
+        norms = np.sqrt(np.bincount(rows, markov.data**2, len(documents)))
+        markov.data /= np.where(norms > 0, norms, 1)[rows]
+
+        ngram = vstack(
+            [
+                hashed_markov_vector(document, ngram_order, ngram_features)
+                for document in documents
+            ],
+            format="csr",
+        )
+
+        matrices = {
+            "bow": normalize(counts),
+            "tfidf": tfidf_index.matrix(),
+            "markov": markov,
+            "ngram": normalize(ngram),
+        }
+        return cls(
+            names,
+            [content_hash(document) for document in documents],
+            tfidf_index.terms,
+            tfidf_index.idf(),
+            markov_vocabulary,
+            markov_columns,
+            matrices,
+            ngram_order,
+            ngram_features,
+            stats,
+        )
+
+    def save(self, path):
+        """
+        Save the index to a compressed .npz file.
+
+        Args:
+            path (str): The file to write.
+        """
+        arrays = {
+            "names": self.names,
+            "hashes": self.hashes,
+            "stats": self.stats,
+            "vocabulary": self.vocabulary,
+            "idf": self.tfidf_transformer.idf_,
+            "markov_vocabulary": self.markov_vocabulary,
+            "markov_columns": self.markov_columns,
+            "ngram_params": np.array(
+                [self.ngram_order, self.ngram_features], dtype=np.int64
+            ),
+        }
+        for technique, matrix in self.matrices.items():
+            arrays[technique + "_data"] = matrix.data
+            arrays[technique + "_indices"] = matrix.indices
+            arrays[technique + "_indptr"] = matrix.indptr
+            arrays[technique + "_shape"] = np.array(matrix.shape, dtype=np.int64)
+        np.savez_compressed(path, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load an index written by save. Techniques missing from older files are
+        left out of matrices.
+
+        Args:
+            path (str): The .npz file.
+
+        Returns:
+            ReferenceIndex: The index.
+        """
+        from scipy.sparse import csr_matrix
+
+        with np.load(path) as arrays:
+            matrices = {
+                technique: csr_matrix(
+                    (
+                        arrays[technique + "_data"],
+                        arrays[technique + "_indices"],
+                        arrays[technique + "_indptr"],
+                    ),
+                    shape=tuple(arrays[technique + "_shape"]),
+                )
+                for technique in cls.TECHNIQUES
+                if technique + "_data" in arrays
+            }
+            ngram_params = (
+                arrays["ngram_params"] if "ngram_params" in arrays else (0, 0)
+            )
+            return cls(
+                arrays["names"],
+                arrays["hashes"],
+                arrays["vocabulary"],
+                arrays["idf"],
+                arrays["markov_vocabulary"],
+                arrays["markov_columns"],
+                matrices,
+                *ngram_params,
+                stats=arrays["stats"] if "stats" in arrays else None,
+            )
+
+    def vectorize(self, document):
+        """
+        Vectorize a query document like the references.
+
+        Words missing from the references cannot match, but they still count in the
+        norm of the query, so cosines equal comparing the two documents directly.
+
+        Args:
+            document (str): The query document.
+
+        Returns:
+            dict: A dense L2-normalized vector per technique, with one value per
+                  column of the matrix of the references.
+        """
+        # ===== BoW y TF-IDF =====
+        terms = Counter(self.bow_vectorizer.build_analyzer()(document))
+        missing = sum(
+            count * count
+            for term, count in terms.items()
+            if term not in self.bow_vectorizer.vocabulary
+        )
+        counts = self.bow_vectorizer.transform([document]).astype(np.float64)
+        weights = counts.multiply(self.tfidf_transformer.idf_).tocsr()
+        # idf de un término que no aparece en ninguna referencia
+        missing_idf = np.log((1 + len(self.names)) / 1) + 1
+
+        bow_norm = np.sqrt(counts.multiply(counts).sum() + missing)
+        tfidf_norm = np.sqrt(weights.multiply(weights).sum() + missing * missing_idf**2)
+
+        # ===== Cadenas de Markov =====
+        size = len(self.markov_words)
+        extra = sorted(set(document.lower().split()).difference(self.word_to_index))
+        markov = markov_matrix(
+            document,
+            self.markov_words + extra,
+            ChainMap(
+                {word: size + i for i, word in enumerate(extra)}, self.word_to_index
+            ),
+        ).tocoo()
+        markov_norm = np.sqrt((markov.data**2).sum())
+        known = (markov.row < size) & (markov.col < size)
+        codes = markov.row[known].astype(np.int64) * size + markov.col[known]
+        positions = np.searchsorted(self.markov_columns, codes)
+        found = positions < len(self.markov_columns)
+        found[found] = self.markov_columns[positions[found]] == codes[found]
+        markov_vector = np.zeros(len(self.markov_columns))
+        markov_vector[positions[found]] = markov.data[known][found]
+
+        # ===== N-gramas con hash: mismo espacio que las referencias =====
+        ngram = hashed_markov_vector(document, self.ngram_order, self.ngram_features)
+        ngram_norm = np.sqrt((ngram.data**2).sum())
+
+        return {
+            "bow": counts.toarray().ravel() / (bow_norm or 1),
+            "tfidf": weights.toarray().ravel() / (tfidf_norm or 1),
+            "markov": markov_vector / (markov_norm or 1),
+            "ngram": ngram.toarray().ravel() / (ngram_norm or 1),
+        }
+
+    def query(self, document, k=10):
+        """
+        Find the references most similar to a document with every technique.
+
+        Args:
+            document (str): The query document.
+            k (int): The number of references to return per technique.
+
+        Returns:
+            dict: For each technique, a list of (name, cosine similarity) tuples
+                  from the most to the least similar.
+        """
+        vectors = self.vectorize(document)
+
+        results = {}
+        for technique in self.matrices:
+            scores = self.matrices[technique] @ vectors[technique]
+            top = min(k, len(scores))
+            best = np.argpartition(-scores, top - 1)[:top] if top else []
+            best = sorted(best, key=lambda i: -scores[i])
+            results[technique] = [(str(self.names[i]), float(scores[i])) for i in best]
+        return results
@@ -0,0 +1,149 @@
+import numpy as np
+import zlib
+from itertools import repeat
+
+
+def markov_matrix(document, vocab, word_to_index=None):
+    """
+    Calculate a Markov matrix representing the probability of transitioning from one word to another in a document.
+
+    Words are mapped to vocabulary indices once, every bigram is encoded as
+    first * len(vocab) + second, and all transitions are counted with a single
+    np.unique over those codes. Only observed transitions are stored, so memory
+    grows with the number of distinct bigrams instead of with len(vocab) ** 2.
+
+    Args:
+        document (str): The document to generate the matrix for.
+        vocab (list): The list of words to consider.
+        word_to_index (dict): Optional {word: index in vocab}, to avoid rebuilding
+                              it when many documents share the same vocab.
+
+    Returns:
+        scipy.sparse.csr_matrix: The len(vocab) x len(vocab) Markov transition matrix.
+    """
+    from scipy.sparse import csr_matrix
+
+    words = document.lower().split()
+    size = len(vocab)
+    if word_to_index is None:
+        word_to_index = {word: idx for idx, word in enumerate(vocab)}
+
+    indices = np.fromiter(
+        map(word_to_index.get, words, repeat(-1)), dtype=np.int64, count=len(words)
+    )
+    first = indices[:-1]
+    second = indices[1:]
+    valid = (first >= 0) & (second >= 0)
+
+    pairs, counts = np.unique(first[valid] * size + second[valid], return_counts=True)
+    rows = pairs // size
+    cols = pairs % size
+
+    row_sums = np.bincount(rows, weights=counts, minlength=size)
+    return csr_matrix((counts / row_sums[rows], (rows, cols)), shape=(size, size))
+
+
+def sparse_cosine(a, b):
+    """
+    Calculate the cosine similarity between two sparse matrices of the same shape,
+    treating each one as a single flattened vector.
+
+    Args:
+        a (scipy.sparse.spmatrix): The first matrix.
+        b (scipy.sparse.spmatrix): The second matrix.
+
+    Returns:
+        float: The cosine similarity, or 0.0 if either matrix is all zeros.
+    """
+    norm = np.sqrt(a.multiply(a).sum() * b.multiply(b).sum())
+    if norm == 0:
+        return 0.0
+    return a.multiply(b).sum() / norm
+
+
+# Columnas del espacio de transiciones con hash (2**20, como HashingVectorizer)
+HASHED_FEATURES = 1 << 20
+
+
+def mix64(values):
+    """
+    Scramble 64-bit integers with the splitmix64 finalizer, so every input bit
+    affects every output bit.
+
+    Args:
+        values (numpy.ndarray): The uint64 values.
+
+    Returns:
+        numpy.ndarray: The scrambled uint64 values.
+    """
+    values = values ^ (values >> np.uint64(30))
+    values = values * np.uint64(0xBF58476D1CE4E5B9)
+    values = values ^ (values >> np.uint64(27))
+    values = values * np.uint64(0x94D049BB133111EB)
+    return values ^ (values >> np.uint64(31))
+
+
+def hashed_markov_vector(document, order=1, n_features=HASHED_FEATURES, seed=0):
+    """
+    Calculate the k-th order Markov transitions of a document in a fixed-width
+    hashed feature space.
+
+    Every transition from the `order` previous words (the context) to the next
+    word is hashed into one of n_features columns, and its value is the
+    probability of that word after that context, as in the rows of
+    markov_matrix. Words are hashed with CRC32 and combined with mix64, so the
+    columns are the same in every run and for every document: the vector of a
+    document is computed once and can be compared with sparse_cosine against
+    any other vector with the same parameters, without a shared vocabulary.
+    With order=1 the cosine equals that of markov_matrix over the joint
+    vocabulary, except for hash collisions.
+
+    Args:
+        document (str): The document.
+        order (int): The number of previous words each transition depends on.
+        n_features (int): The width of the vector.
+        seed (int): Seed of the hash, to change which transitions collide.
+
+    Returns:
+        scipy.sparse.csr_matrix: A 1 x n_features row (empty if the document has
+                                 no more than `order` words). A ValueError is
+                                 raised if order or n_features is below 1.
+    """
+    if order < 1:
+        raise ValueError(f"order must be at least 1, got {order}")
+    if n_features < 1:
+        raise ValueError(f"n_features must be at least 1, got {n_features}")
+
+    from scipy.sparse import csr_matrix
+
+    words = document.lower().split()
+    transitions = len(words) - order
+    if transitions <= 0:
+        return csr_matrix((1, n_features))
+
+    # Hash de cada palabra distinta, calculado una sola vez
+    distinct = {}
+    ids = np.fromiter(
+        (distinct.setdefault(word, len(distinct)) for word in words),
+        dtype=np.int64,
+        count=len(words),
+    )
+    word_hashes = np.fromiter(
+        (zlib.crc32(word.encode()) for word in distinct),
+        dtype=np.uint64,
+        count=len(distinct),
+    )[ids]
+
+    # Contexto de cada transición: las `order` palabras previas en un entero
+    context = np.full(transitions, seed, dtype=np.uint64)
+    for offset in range(order):
+        context = mix64(context + word_hashes[offset : offset + transitions])
+    columns = mix64(context + word_hashes[order:]) % np.uint64(n_features)
+
+    # Cada aparición vale 1 / apariciones de su contexto; sumadas dan la probabilidad
+    _, inverse, counts = np.unique(context, return_inverse=True, return_counts=True)
+    values = 1.0 / counts[inverse]
+    return csr_matrix(
+        (values, (np.zeros(transitions, dtype=np.int64), columns.astype(np.int64))),
+        shape=(1, n_features),
+    )
@@ -0,0 +1,133 @@
+import numpy as np
+import zlib
+
+# Primo menor que 2**32: a * x + b cabe en uint64 para hashes de 32 bits
+MINHASH_PRIME = 4294967291
+
+
+def shingle_hashes(document, size=1):
+    """
+    Hash the word shingles (runs of `size` consecutive words) of a document.
+
+    Args:
+        document (str): The document.
+        size (int): The number of words per shingle; shorter documents are a
+                    single shingle.
+
+    Returns:
+        numpy.ndarray: The distinct 32-bit CRC of every shingle.
+    """
+    words = document.lower().split()
+    if not words:
+        return np.zeros(0, dtype=np.uint64)
+    shingles = {
+        " ".join(words[i : i + size]) for i in range(max(1, len(words) - size + 1))
+    }
+    return np.fromiter(
+        (zlib.crc32(shingle.encode()) for shingle in shingles),
+        dtype=np.uint64,
+        count=len(shingles),
+    )
+
+
+def minhash_signatures(documents, num_perm=128, shingle_size=1, seed=0):
+    """
+    Calculate the MinHash signature of every document, so the fraction of equal
+    positions in two signatures estimates the Jaccard similarity of their shingle
+    sets. Every permutation is applied to the shingles of all documents at once.
+
+    Args:
+        documents (list): The documents.
+        num_perm (int): The length of the signatures.
+        shingle_size (int): The number of words per shingle.
+        seed (int): Seed of the random hash functions.
+
+    Returns:
+        numpy.ndarray: A len(documents) x num_perm uint64 array; documents without
+                       words get MINHASH_PRIME in every position.
+    """
+    if not len(documents):
+        return np.empty((0, num_perm), dtype=np.uint64)
+
+    hashes = [shingle_hashes(document, shingle_size) for document in documents]
+    lengths = np.array([len(h) for h in hashes], dtype=np.int64)
+    # Un shingle ficticio para los documentos vacíos, descartado al final
+    shingles = np.concatenate(
+        [h if len(h) else np.zeros(1, dtype=np.uint64) for h in hashes]
+    ).astype(np.uint64)
+    starts = np.concatenate([[0], np.cumsum(np.maximum(lengths, 1))[:-1]])
+
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, MINHASH_PRIME, num_perm, dtype=np.uint64)
+    b = rng.integers(0, MINHASH_PRIME, num_perm, dtype=np.uint64)
+
+    signatures = np.empty((len(documents), num_perm), dtype=np.uint64)
+    for i in range(num_perm):
+        permuted = (a[i] * shingles + b[i]) % np.uint64(MINHASH_PRIME)
+        signatures[:, i] = np.minimum.reduceat(permuted, starts)
+    signatures[lengths == 0] = MINHASH_PRIME
+    return signatures
+
+
+def lsh_bands(num_perm, threshold):
+    """
+    Choose how to split the signatures into bands so that pairs with a Jaccard
+    similarity of about `threshold` have a 50% chance of sharing a bucket.
+
+    Args:
+        num_perm (int): The length of the signatures.
+        threshold (float): The target Jaccard similarity.
+
+    Returns:
+        tuple: (bands, rows) with bands * rows <= num_perm.
+    """
+    return min(
+        ((num_perm // rows, rows) for rows in range(1, num_perm + 1)),
+        key=lambda option: abs((1 / option[0]) ** (1 / option[1]) - threshold),
+    )
+
+
+def lsh_candidates(signatures, threshold):
+    """
+    Find the pairs of documents whose estimated Jaccard similarity is at least
+    `threshold`, without comparing every pair: documents are bucketed by each band
+    of their signature and only documents sharing a bucket are compared.
+
+    Args:
+        signatures (numpy.ndarray): The output of minhash_signatures.
+        threshold (float): The minimum estimated Jaccard similarity.
+
+    Returns:
+        list: (i, j, estimated Jaccard) tuples with i < j, sorted by i and j.
+    """
+    bands, rows = lsh_bands(signatures.shape[1], threshold)
+    valid = np.flatnonzero(signatures[:, 0] != MINHASH_PRIME)
+
+    # Cada banda se reduce a una sola clave de 64 bits (las colisiones se
+    # descartan después al estimar el Jaccard)
+    weights = np.random.default_rng(0).integers(
+        1, 2**63, rows, dtype=np.uint64
+    ) | np.uint64(1)
+
+    candidates = set()
+    for band in range(bands):
+        block = signatures[valid, band * rows : (band + 1) * rows]
+        keys = (block * weights).sum(axis=1, dtype=np.uint64)
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+        ends = np.r_[starts[1:], len(sorted_keys)]
+        for start, end in zip(starts[ends - starts > 1], ends[ends - starts > 1]):
+            group = np.sort(valid[order[start:end]]).tolist()
+            candidates.update(
+                (group[x], group[y])
+                for x in range(len(group))
+                for y in range(x + 1, len(group))
+            )
+
+    if not candidates:
+        return []
+    pairs = np.array(sorted(candidates), dtype=np.int64)
+    jaccard = (signatures[pairs[:, 0]] == signatures[pairs[:, 1]]).mean(axis=1)
+    keep = jaccard >= threshold
+    return list(zip(pairs[keep, 0].tolist(), pairs[keep, 1].tolist(), jaccard[keep]))
@@ -0,0 +1,114 @@
+import numpy as np
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+import csv
+import os
+import sys
+import time
+
+
+def read_chunks(path, chunk_size=1000):
+    """
+    Read the question pairs of a CSV file in chunks.
+
+    Args:
+        path (str): The CSV file, with question1 and question2 columns.
+        chunk_size (int): The maximum number of pairs per chunk.
+
+    Yields:
+        list: Up to chunk_size (question1, question2) tuples.
+    """
+    with open(path, "r") as file:
+        reader = csv.DictReader(file)
+        pairs = ((row["question1"], row["question2"]) for row in reader)
+        chunk = list(islice(pairs, chunk_size))
+        while chunk:
+            yield chunk
+            chunk = list(islice(pairs, chunk_size))
+
+
+def fit_vocabulary(chunks, analyzer):
+    """
+    Build the vocabulary and document frequencies of a corpus of question pairs
+    read in chunks, so only the distinct terms are kept in memory.
+
+    Args:
+        chunks (iterable): Lists of (question1, question2) tuples.
+        analyzer (callable): Splits a text into terms, e.g. CountVectorizer().build_analyzer().
+
+    Returns:
+        tuple: (vocabulary, document_frequency, documents), where vocabulary maps
+               each term to its column in alphabetical order (as CountVectorizer
+               does), document_frequency is an array with one count per column
+               and documents is the number of texts read.
+    """
+    counts = Counter()
+    documents = 0
+    for chunk in chunks:
+        for pair in chunk:
+            for text in pair:
+                counts.update(set(analyzer(text)))
+                documents += 1
+
+    terms = sorted(counts)
+    vocabulary = {term: i for i, term in enumerate(terms)}
+    document_frequency = np.array([counts[term] for term in terms], dtype=np.float64)
+    return vocabulary, document_frequency, documents
+
+
+class Progress:
+    """
+    Count the processed rows and report the throughput on stderr.
+    """
+
+    def __init__(self, verbose=False):
+        self.verbose = verbose
+        self.rows = 0
+        self.start = time.perf_counter()
+
+    def update(self, rows):
+        self.rows += rows
+        if self.verbose:
+            print(f"{self.rows} rows, {self.rate():.0f} rows/sec", file=sys.stderr)
+
+    def rate(self):
+        return self.rows / max(time.perf_counter() - self.start, 1e-9)
+
+
+def parallel_map(function, items, jobs=1, initializer=None, initargs=()):
+    """
+    Apply a function to every item, optionally in worker processes, keeping the
+    order of the items.
+
+    Each worker runs initializer(*initargs) once when it starts, so shared state
+    is sent once per worker instead of with every item. At most 2 * jobs items
+    are in flight at a time, so items can come from a lazy iterable.
+
+    Args:
+        function (callable): Called with each item; must be a module-level function.
+        items (iterable): The items to process.
+        jobs (int): Worker processes (0 or None: one per core, 1: no workers).
+        initializer (callable): Sets the shared state, also called when jobs == 1.
+        initargs (tuple): Arguments for the initializer.
+
+    Yields:
+        The results of function, in the order of items.
+    """
+    jobs = jobs or os.cpu_count()
+    if jobs == 1:
+        if initializer is not None:
+            initializer(*initargs)
+        yield from map(function, items)
+        return
+
+    with ProcessPoolExecutor(
+        jobs, initializer=initializer, initargs=initargs
+    ) as executor:
+        pending = deque()
+        for item in items:
+            pending.append(executor.submit(function, item))
+            if len(pending) >= 2 * jobs:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
@@ -0,0 +1,53 @@
+import numpy as np
+
+
+def classify(score):
+    """
+    Classify a given score as either "Low", "Moderate", or "High" based on the following ranges:
+        Low: score < 0.4
+        Moderate: 0.4 <= score < 0.7
+        High: score >= 0.7
+
+    Args:
+        score (float): The score to be classified.
+
+    Returns:
+        str: The classification of the score.
+    """
+    if score < 0.4:
+        return "Low"
+    elif score < 0.7:
+        return "Moderate"
+    else:
+        return "High"
+
+
+def row_cosine(a, b):
+    """
+    Calculate the cosine similarity between each row of a and the same row of b.
+
+    Args:
+        a (scipy.sparse.spmatrix): The first matrix, one document per row.
+        b (scipy.sparse.spmatrix): The second matrix, with the same shape as a.
+
+    Returns:
+        numpy.ndarray: One similarity per row (0.0 for empty rows).
+    """
+    from sklearn.preprocessing import normalize
+
+    return np.asarray(normalize(a).multiply(normalize(b)).sum(axis=1)).ravel()
+
+
+def sparse_entries(matrix):
+    """
+    Convert a sparse matrix into a dictionary of its non-zero entries.
+
+    Args:
+        matrix (scipy.sparse.spmatrix): The matrix to convert.
+
+    Returns:
+        dict: The non-zero values keyed by their index in the flattened matrix.
+    """
+    coo = matrix.tocoo()
+    flat_index = coo.row.astype(np.int64) * coo.shape[1] + coo.col
+    return dict(zip(flat_index.tolist(), coo.data.tolist()))
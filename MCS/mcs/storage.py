@@ -0,0 +1,262 @@
+import numpy as np
+import csv
+import hashlib
+import io
+import sqlite3
+import tempfile
+import time
+
+from .similarity import sparse_entries
+
+
+def spooled(file, dtype):
+    """
+    Map the values written to a temporary file with ndarray.tofile.
+
+    Args:
+        file (file): The temporary file.
+        dtype (numpy.dtype): The type of the values.
+
+    Returns:
+        numpy.ndarray: A read-only memory map of the values (an empty array if none).
+    """
+    file.flush()
+    if file.tell() == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(file, dtype=dtype, mode="r")
+
+
+class SimilarityWriter:
+    """
+    Write similarity rows to a CSV file through a single open handle, in batches.
+
+    Vectors are written inline (lists for dense vectors, {flat index: value}
+    dicts for sparse ones) or, when vectors_path is given, to a compressed .npz
+    sidecar where every vector column is stored as sparse rows keyed by row id
+    and the CSV gets a row_id column instead of the vector columns. Sidecar
+    vectors are spooled to temporary files until close, so memory stays bounded.
+    """
+
+    def __init__(
+        self, path, columns, vector_columns, vectors_path=None, batch_size=1000
+    ):
+        self.file = open(path, "w", newline="")
+        self.writer = csv.writer(self.file)
+        self.vector_columns = vector_columns
+        self.vectors_path = vectors_path
+        self.batch_size = batch_size
+        self.batch = []
+        self.rows = 0
+        self.parts = {}
+        self.nnz = dict.fromkeys(vector_columns, 0)
+
+        if vectors_path is None:
+            self.writer.writerow(columns + vector_columns)
+        else:
+            self.writer.writerow(["row_id"] + columns)
+            # Por columna: datos, índices y (fin, ancho) de cada fila
+            for name in vector_columns:
+                self.parts[name] = tuple(tempfile.TemporaryFile() for _ in range(3))
+
+    def write(self, values, vectors):
+        """
+        Add one row.
+
+        Args:
+            values (list): The scalar cells of the row.
+            vectors (list): One dense array or sparse matrix per vector column.
+        """
+        from scipy.sparse import issparse
+
+        if self.vectors_path is None:
+            self.batch.append(
+                list(values)
+                + [
+                    sparse_entries(v) if issparse(v) else np.asarray(v).tolist()
+                    for v in vectors
+                ]
+            )
+        else:
+            self.batch.append([self.rows] + list(values))
+            for name, vector in zip(self.vector_columns, vectors):
+                data, indices, rows = self.parts[name]
+                if issparse(vector):
+                    coo = vector.tocoo()
+                    index = coo.row.astype(np.int64) * coo.shape[1] + coo.col
+                    nonzero = coo.data
+                else:
+                    vector = np.asarray(vector).ravel()
+                    index = np.flatnonzero(vector)
+                    nonzero = vector[index]
+                np.asarray(nonzero, dtype=np.float64).tofile(data)
+                np.asarray(index, dtype=np.int64).tofile(indices)
+                self.nnz[name] += len(index)
+                np.array(
+                    [self.nnz[name], np.prod(vector.shape)], dtype=np.int64
+                ).tofile(rows)
+        self.rows += 1
+
+        if len(self.batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        self.writer.writerows(self.batch)
+        self.batch = []
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+        if self.vectors_path is not None:
+            arrays = {}
+            for name, (data, indices, rows) in self.parts.items():
+                ends = spooled(rows, np.int64)
+                arrays[name + "_data"] = spooled(data, np.float64)
+                arrays[name + "_indices"] = spooled(indices, np.int64)
+                arrays[name + "_indptr"] = np.concatenate([[0], ends[0::2]])
+                arrays[name + "_width"] = ends[1::2]
+            np.savez_compressed(self.vectors_path, **arrays)
+
+        for part in self.parts.values():
+            for spool in part:
+                spool.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def load_vector(vectors, name, row_id):
+    """
+    Read one vector back from a sidecar written by SimilarityWriter.
+
+    Args:
+        vectors (dict): The sidecar arrays, e.g. dict(np.load(path)).
+        name (str): The vector column.
+        row_id (int): The row id from the CSV.
+
+    Returns:
+        scipy.sparse.csr_matrix: The vector as a 1 x width sparse row.
+    """
+    from scipy.sparse import csr_matrix
+
+    start, end = vectors[name + "_indptr"][row_id : row_id + 2]
+    return csr_matrix(
+        (
+            vectors[name + "_data"][start:end],
+            vectors[name + "_indices"][start:end],
+            [0, end - start],
+        ),
+        shape=(1, vectors[name + "_width"][row_id]),
+    )
+
+
+def content_hash(text):
+    """
+    Calculate the SHA-256 hash of a text.
+
+    Args:
+        text (str): The text.
+
+    Returns:
+        str: The hexadecimal digest.
+    """
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+class VectorCache:
+    """
+    SQLite store of sparse vectors with least-recently-used eviction.
+
+    Entries are keyed by the hash of everything the vectors depend on (the content
+    of the documents, the technique and its parameters), so a changed file simply
+    stops matching its old entries, which are evicted once the cache is full.
+    """
+
+    def __init__(self, path, max_bytes=256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.connection = sqlite3.connect(path, timeout=60)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS vectors "
+            "(key TEXT PRIMARY KEY, value BLOB, size INTEGER, used REAL)"
+        )
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS vectors_used ON vectors (used)"
+        )
+        self.connection.commit()
+
+    @staticmethod
+    def key(*parts):
+        return hashlib.sha256("\0".join(map(str, parts)).encode()).hexdigest()
+
+    def get(self, key):
+        """
+        Read an entry and mark it as recently used.
+
+        Args:
+            key (str): The key, e.g. from VectorCache.key.
+
+        Returns:
+            scipy.sparse.csr_matrix: The cached matrix, or None if there is none.
+        """
+        from scipy.sparse import csr_matrix
+
+        row = self.connection.execute(
+            "SELECT value FROM vectors WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        self.connection.execute(
+            "UPDATE vectors SET used = ? WHERE key = ?", (time.time(), key)
+        )
+        self.connection.commit()
+
+        with np.load(io.BytesIO(row[0])) as arrays:
+            return csr_matrix(
+                (arrays["data"], arrays["indices"], arrays["indptr"]),
+                shape=tuple(arrays["shape"]),
+            )
+
+    def put(self, key, matrix):
+        """
+        Store an entry, evicting the least recently used ones past max_bytes.
+
+        Args:
+            key (str): The key, e.g. from VectorCache.key.
+            matrix (scipy.sparse.spmatrix): The vectors to store.
+        """
+        from scipy.sparse import csr_matrix
+
+        matrix = csr_matrix(matrix)
+        buffer = io.BytesIO()
+        np.savez(
+            buffer,
+            data=matrix.data,
+            indices=matrix.indices,
+            indptr=matrix.indptr,
+            shape=np.array(matrix.shape, dtype=np.int64),
+        )
+        value = buffer.getvalue()
+        self.connection.execute(
+            "INSERT OR REPLACE INTO vectors VALUES (?, ?, ?, ?)",
+            (key, value, len(value), time.time()),
+        )
+
+        # Desalojar las entradas menos usadas hasta volver al límite
+        total = self.connection.execute("SELECT SUM(size) FROM vectors").fetchone()[0]
+        if total > self.max_bytes:
+            evicted = []
+            for old_key, size in self.connection.execute(
+                "SELECT key, size FROM vectors ORDER BY used"
+            ).fetchall():
+                if total <= self.max_bytes:
+                    break
+                evicted.append((old_key,))
+                total -= size
+            self.connection.executemany("DELETE FROM vectors WHERE key = ?", evicted)
+        self.connection.commit()
+
+    def close(self):
+        self.connection.close()
@@ -0,0 +1,229 @@
+import argparse
+import os
+import sys
+
+from . import ROOT
+from .markov import markov_matrix, sparse_cosine
+from .minhash import lsh_candidates, minhash_signatures
+from .pipeline import Progress, parallel_map, read_chunks
+from .similarity import row_cosine
+from .storage import SimilarityWriter
+from .tfidf import TfidfIndex
+
+model = None
+
+
+def init_worker(corpus_model):
+    """
+    Set the corpus model used by score_chunk in a worker process.
+
+    Args:
+        corpus_model (tuple): (CountVectorizer, TfidfTransformer) fitted on the
+                              whole corpus, or None to fit each pair on its own.
+    """
+    global model
+    model = corpus_model
+
+
+def score_chunk(questions):
+    """
+    Calculate the BoW, TF-IDF and Markov similarities of a chunk of question pairs.
+
+    Args:
+        questions (list): The (question1, question2) tuples.
+
+    Returns:
+        list: One (values, vectors) tuple per pair, as taken by SimilarityWriter.write.
+    """
+    from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
+    from sklearn.metrics.pairwise import cosine_similarity
+
+    rows = []
+    if model is not None:
+        bow_vectorizer, tfidf_transformer = model
+
+        # ===== Vectorización del bloque con el vocabulario del corpus =====
+        q1_bow = bow_vectorizer.transform([q1 for q1, _ in questions])
+        q2_bow = bow_vectorizer.transform([q2 for _, q2 in questions])
+        cos_bows = row_cosine(q1_bow, q2_bow)
+
+        q1_tfidf = tfidf_transformer.transform(q1_bow)
+        q2_tfidf = tfidf_transformer.transform(q2_bow)
+        cos_tfidfs = row_cosine(q1_tfidf, q2_tfidf)
+
+        for i, (q1, q2) in enumerate(questions):
+            vocab = list(set(q1.lower().split() + q2.lower().split()))
+
+            # ===== Cadenas de Markov =====
+            q1_mark_vec = markov_matrix(q1, vocab)
+            q2_mark_vec = markov_matrix(q2, vocab)
+
+            values = [
+                q1,
+                q2,
+                cos_bows[i],
+                cos_tfidfs[i],
+                sparse_cosine(q1_mark_vec, q2_mark_vec),
+            ]
+            vectors = [
+                q1_bow[i],
+                q2_bow[i],
+                q1_tfidf[i],
+                q2_tfidf[i],
+                q1_mark_vec,
+                q2_mark_vec,
+            ]
+            rows.append((values, vectors))
+    else:
+        for q1, q2 in questions:
+            texts = [q1, q2]
+            vocab = list(set(q1.lower().split() + q2.lower().split()))
+
+            # ===== BoW (Bag of Words) =====
+            bow_vectorizer = CountVectorizer()
+            bow_matrix = bow_vectorizer.fit_transform(texts)
+            bow_array = bow_matrix.toarray()
+
+            cos_bow = cosine_similarity(bow_array[0:1], bow_array[1:2])[0][0]
+
+            # ===== TF-IDF =====
+            tfidf_vectorizer = TfidfVectorizer()
+            tfidf_matrix = tfidf_vectorizer.fit_transform(texts)
+            tfidf_array = tfidf_matrix.toarray()
+
+            cos_tfidf = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0]
+
+            # ===== Cadenas de Markov =====
+            q1_mark_vec = markov_matrix(q1, vocab)
+            q2_mark_vec = markov_matrix(q2, vocab)
+
+            cos_mark = sparse_cosine(q1_mark_vec, q2_mark_vec)
+
+            # Guardar resultados
+            values = [q1, q2, cos_bow, cos_tfidf, cos_mark]
+            vectors = [
+                bow_array[0],
+                bow_array[1],
+                tfidf_array[0],
+                tfidf_array[1],
+                q1_mark_vec,
+                q2_mark_vec,
+            ]
+            rows.append((values, vectors))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="BoW, TF-IDF and Markov similarity")
+    parser.add_argument(
+        "--corpus",
+        action="store_true",
+        help="fit BoW and TF-IDF once over all questions (IDF becomes corpus-wide)",
+    )
+    parser.add_argument(
+        "--vectors",
+        default=None,
+        help="write the vectors to this .npz sidecar instead of inline in the CSV",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=1000,
+        help="question pairs read and scored at a time",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="worker processes (0: one per core, default: 1)",
+    )
+    parser.add_argument(
+        "--progress",
+        action="store_true",
+        help="report rows and rows/sec on stderr after each chunk",
+    )
+    parser.add_argument(
+        "--near-duplicates",
+        type=float,
+        default=None,
+        metavar="THRESHOLD",
+        help="score every pair of questions whose estimated Jaccard similarity "
+        "(MinHash LSH) is at least THRESHOLD instead of the pairs of the file",
+    )
+    parser.add_argument(
+        "--num-perm", type=int, default=128, help="MinHash signature length"
+    )
+    parser.add_argument(
+        "--shingle-size", type=int, default=1, help="words per MinHash shingle"
+    )
+    args = parser.parse_args(argv)
+
+    input_path = os.path.join(ROOT, "Act 4.3", "similarity.csv")
+    output_path = os.path.join(ROOT, "Act 4.3", "tf_idf_markov.csv")
+    progress = Progress(args.progress)
+    chunks = read_chunks(input_path, args.chunk_size)
+
+    if args.near_duplicates is not None:
+        # Candidatos por LSH entre todas las preguntas distintas del archivo
+        questions = list(
+            dict.fromkeys(
+                question
+                for chunk in read_chunks(input_path, args.chunk_size)
+                for pair in chunk
+                for question in pair
+            )
+        )
+        signatures = minhash_signatures(questions, args.num_perm, args.shingle_size)
+        candidates = lsh_candidates(signatures, args.near_duplicates)
+        pairs = [(questions[i], questions[j]) for i, j, _ in candidates]
+        if args.progress:
+            print(
+                f"{len(questions)} questions, {len(pairs)} candidate pairs",
+                file=sys.stderr,
+            )
+
+        output_path = os.path.join(ROOT, "Act 4.3", "near_duplicates.csv")
+        chunks = (
+            pairs[start : start + args.chunk_size]
+            for start in range(0, len(pairs), args.chunk_size)
+        )
+
+    corpus_model = None
+    if args.corpus:
+        from sklearn.feature_extraction.text import CountVectorizer, TfidfTransformer
+
+        # Primera pasada: índice invertido de todas las preguntas del corpus
+        corpus = TfidfIndex()
+        for chunk in read_chunks(input_path, args.chunk_size):
+            for pair in chunk:
+                for text in pair:
+                    corpus.add(text)
+        bow_vectorizer = CountVectorizer(vocabulary=corpus.vocabulary)
+        tfidf_transformer = TfidfTransformer()
+        tfidf_transformer.idf_ = corpus.idf()
+        corpus_model = (bow_vectorizer, tfidf_transformer)
+
+    # Escribir resultados bloque por bloque
+    with SimilarityWriter(
+        output_path,
+        ["question1", "question2", "cos_BOW", "cos_TFID", "cos_MARK"],
+        [
+            "q1_vecBoW",
+            "q2_vecBoW",
+            "q1_vecTFIDF",
+            "q2_vecTFIDF",
+            "q1_vecMark",
+            "q2_vecMark",
+        ],
+        args.vectors,
+    ) as writer:
+        results = parallel_map(
+            score_chunk, chunks, args.jobs, init_worker, (corpus_model,)
+        )
+        for rows in results:
+            for values, vectors in rows:
+                writer.write(values, vectors)
+
+            progress.update(len(rows))
+    return 0
@@ -0,0 +1,121 @@
+import numpy as np
+from array import array
+from collections import Counter
+
+
+class TfidfIndex:
+    """
+    Corpus-level TF-IDF engine backed by an inverted index.
+
+    Every document is split into terms once, with the analyzer of sklearn's
+    CountVectorizer unless another one is given. The index maps each term to its
+    postings: the ids of the documents containing it and how many times. The
+    document frequency of a term is the length of its postings, so it is up to
+    date after every add(). The weights are those of sklearn's TfidfVectorizer:
+
+        idf(t) = ln((1 + N) / (1 + df(t))) + 1
+        tfidf(t, d) = count of t in d * idf(t), with every row L2-normalized
+
+    where N is the number of documents. Columns are the terms in alphabetical
+    order, as in CountVectorizer.
+    """
+
+    def __init__(self, documents=(), analyzer=None):
+        if analyzer is None:
+            from sklearn.feature_extraction.text import CountVectorizer
+
+            analyzer = CountVectorizer().build_analyzer()
+        self.analyzer = analyzer
+        # término -> (ids de documento, apariciones), en arrays compactos
+        self.postings = {}
+        self.documents = 0
+        for document in documents:
+            self.add(document)
+
+    def add(self, document):
+        """
+        Add a document to the index.
+
+        Args:
+            document (str): The document.
+
+        Returns:
+            int: The id of the document (its row in counts() and matrix()).
+        """
+        doc_id = self.documents
+        for term, count in Counter(self.analyzer(document)).items():
+            postings = self.postings.get(term)
+            if postings is None:
+                postings = self.postings[term] = (array("q"), array("q"))
+            postings[0].append(doc_id)
+            postings[1].append(count)
+        self.documents += 1
+        return doc_id
+
+    def __len__(self):
+        return self.documents
+
+    @property
+    def terms(self):
+        """list: Every term in the index, in column order."""
+        return sorted(self.postings)
+
+    @property
+    def vocabulary(self):
+        """dict: The column of every term, as CountVectorizer's vocabulary_."""
+        return {term: column for column, term in enumerate(self.terms)}
+
+    def document_frequency(self, term):
+        postings = self.postings.get(term)
+        return len(postings[0]) if postings is not None else 0
+
+    def idf(self):
+        """
+        Calculate the smoothed idf of every term.
+
+        Returns:
+            numpy.ndarray: One float64 per column, as TfidfTransformer's idf_.
+        """
+        document_frequency = np.array(
+            [len(self.postings[term][0]) for term in self.terms], dtype=np.float64
+        )
+        return np.log((1 + self.documents) / (1 + document_frequency)) + 1
+
+    def counts(self):
+        """
+        Build the term counts of every document straight from the postings.
+
+        Returns:
+            scipy.sparse.csr_matrix: A documents x terms int64 matrix, equal to
+                                     CountVectorizer().fit_transform of the
+                                     documents.
+        """
+        from scipy.sparse import csc_matrix
+
+        # Cada columna son las listas de un término: ya están ordenadas por documento
+        columns = [self.postings[term] for term in self.terms]
+        indptr = np.zeros(len(columns) + 1, dtype=np.int64)
+        np.cumsum([len(ids) for ids, _ in columns], out=indptr[1:])
+        indices = np.concatenate(
+            [np.frombuffer(ids, dtype=np.int64) for ids, _ in columns] or [[]]
+        ).astype(np.int64)
+        data = np.concatenate(
+            [np.frombuffer(counts, dtype=np.int64) for _, counts in columns] or [[]]
+        ).astype(np.int64)
+        return csc_matrix(
+            (data, indices, indptr), shape=(self.documents, len(columns))
+        ).tocsr()
+
+    def matrix(self):
+        """
+        Calculate the TF-IDF weight of every term in every document in one pass over
+        the index.
+
+        Returns:
+            scipy.sparse.csr_matrix: A documents x terms matrix with L2-normalized
+                                     rows, equal to TfidfVectorizer().fit_transform
+                                     of the documents.
+        """
+        from sklearn.preprocessing import normalize
+
+        return normalize(self.counts().multiply(self.idf()).tocsr())
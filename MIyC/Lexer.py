@@ -1,4 +1,13 @@
+import codecs
+import io
+import mmap
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
 from enum import IntEnum
+from itertools import chain
+from types import MappingProxyType
 
 
 class Tag(IntEnum):
@@ -49,12 +58,20 @@ class Tag(IntEnum):
 
 
 class Token:
-    tag = Tag.EOF
-    value = None
+    __slots__ = ("tag", "value", "line", "column")
 
-    def __init__(self, tagId, val=None):
+    def __init__(self, tagId, val=None, line=None, column=None):
         self.tag = tagId
         self.value = val
+        self.line = line
+        self.column = column
+
+    ## line AND column ARE ONLY SET ON TOKENS MADE FOR ONE LEXEME:   ##
+    ## NUMBERS, STRINGS, ERRORS AND NON-ASCII CHARACTERS. FIXED     ##
+    ## TOKENS, KEYWORDS, EOF AND IDENTIFIERS (INTERNED IN THE        ##
+    ## SymbolTable) ARE SHARED BY EVERY OCCURRENCE, SO THEIRS ARE    ##
+    ## None. FOR THE POSITION OF ANY TOKEN READ Lexer.token_line AND ##
+    ## token_column RIGHT AFTER scan, OR TokenTable.lines. ##
 
     def __str__(self):
         if self.tag == Tag.GEQ:
@@ -77,93 +94,794 @@ class Token:
             return "'" + str(self.value) + "'"
         elif self.tag == Tag.STRING:
             return str(self.value)
+        elif self.tag == Tag.ERROR:
+            return "ERROR: " + str(self.value)
         else:
             return "'" + chr(self.tag) + "'"
 
 
+class LexicalError(Exception):
+    message = None
+    line = 0
+    column = 0
+
+    def __init__(self, message, line, column):
+        super().__init__(f"{line}:{column}: {message}")
+        self.message = message
+        self.line = line
+        self.column = column
+
+
+LEXEME = re.compile(
+    r"""
+    (\s*)
+    (
+        [^\W\d_][^\W_]*
+      | \d+(?:\.\d*)?
+      | <[=>]?|>=?|:=?|\#[tTfF]?
+      | %[^\n]*\n?
+      | "[^"]*"?
+      | \S
+    )?
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+
+## MASTER PATTERN FOR THE "regex" ENGINE: LEADING WHITESPACE,    ##
+## THEN THE LEXEME, WHICH IS ONE OF word, number, operator,       ##
+## comment, string OR ANY OTHER CHARACTER. THE ALTERNATIVES ARE   ##
+## DISJOINT BY FIRST CHARACTER AND MIRROR THE BRANCHES OF scan, SO ##
+## THE KIND OF A LEXEME IS KNOWN FROM ITS FIRST CHARACTER AND A   ##
+## SINGLE findall CALL SPLITS A WHOLE BUFFER INTO LEXEMES. THE    ##
+## LEXEME IS OPTIONAL SO TRAILING WHITESPACE IS MATCHED ONCE AS A ##
+## WHOLE INSTEAD OF BEING RETRIED FROM EVERY POSITION. ##
+
+FIXED_TOKENS = {
+    "<=": Token(Tag.LEQ, "<="),
+    "<>": Token(Tag.NEQ, "<>"),
+    ">=": Token(Tag.GEQ, ">="),
+    ":=": Token(Tag.ASSIGN, ":="),
+    "#T": Token(Tag.TRUE, "#T"),
+    "#F": Token(Tag.FALSE, "#F"),
+}
+FIXED_TOKENS.update(
+    {
+        chr(code): Token(code)
+        for code in range(128)
+        if not chr(code).isalnum() and (not chr(code).isspace() or code == ord("\n"))
+    }
+)
+
+EOF_TOKEN = Token(Tag.EOF)
+
+## FLYWEIGHTS FOR EVERY LEXEME WHOSE TOKEN NEVER CHANGES: OPERATORS, ##
+## BOOLEANS, ASCII PUNCTUATION AND THE NEWLINE THAT ENDS A COMMENT.  ##
+## THEY ARE SHARED, SO THEIR line/column STAY None; THE POSITION OF  ##
+## THE LAST TOKEN IS ALWAYS IN Lexer.token_line/token_column. ##
+
+
+KEYWORDS = MappingProxyType(
+    {
+        "VAR": Token(Tag.VAR, "VAR"),
+        "FORWARD": Token(Tag.FORWARD, "FORWARD"),
+        "FD": Token(Tag.FORWARD, "FORWARD"),
+        "BACKWARD": Token(Tag.BACKWARD, "BACKWARD"),
+        "BK": Token(Tag.BACKWARD, "BACKWARD"),
+        "RIGHT": Token(Tag.RIGHT, "RIGHT"),
+        "RT": Token(Tag.RIGHT, "RIGHT"),
+        "LEFT": Token(Tag.LEFT, "LEFT"),
+        "LT": Token(Tag.LEFT, "LEFT"),
+        "SETX": Token(Tag.SETX, "SETX"),
+        "SETY": Token(Tag.SETY, "SETY"),
+        "SETXY": Token(Tag.SETXY, "SETXY"),
+        "HOME": Token(Tag.HOME, "HOME"),
+        "CLEAR": Token(Tag.CLEAR, "CLEAR"),
+        "CLS": Token(Tag.CLS, "CLS"),
+        "CIRCLE": Token(Tag.CIRCLE, "CIRCLE"),
+        "ARC": Token(Tag.ARC, "ARC"),
+        "PENUP": Token(Tag.PENUP, "PENUP"),
+        "PU": Token(Tag.PENUP, "PENUP"),
+        "PENDOWN": Token(Tag.PENDOWN, "PENDOWN"),
+        "PD": Token(Tag.PENDOWN, "PENDOWN"),
+        "COLOR": Token(Tag.COLOR, "COLOR"),
+        "PENWIDTH": Token(Tag.PENWIDTH, "PENWIDTH"),
+        "PRINT": Token(Tag.PRINT, "PRINT"),
+        "WHILE": Token(Tag.WHILE, "WHILE"),
+        "IF": Token(Tag.IF, "IF"),
+        "IFELSE": Token(Tag.IFELSE, "IFELSE"),
+        "OR": Token(Tag.OR, "OR"),
+        "AND": Token(Tag.AND, "AND"),
+        "MOD": Token(Tag.MOD, "MOD"),
+    }
+)
+
+## RESERVED WORDS, BUILT ONCE AT IMPORT AND READ-ONLY SO NO LEXER ##
+## CAN ADD TO THEM. ##
+
+
+class SymbolTable:
+    tokens = None
+    max_size = 0
+
+    def __init__(self, max_size=65536):
+        self.tokens = OrderedDict()
+        self.max_size = max_size
+
+    def get(self, lexem):
+        token = self.tokens.get(lexem)
+        if token is None:
+            if len(self.tokens) >= self.max_size:
+                self.tokens.popitem(last=False)
+            token = Token(Tag.ID, lexem)
+            self.tokens[lexem] = token
+        return token
+
+    def __len__(self):
+        return len(self.tokens)
+
+    ## INTERNS ONE Token PER IDENTIFIER. WHEN max_size IS REACHED  ##
+    ## THE OLDEST ENTRY IS DROPPED, SO THE TABLE NEVER GROWS PAST   ##
+    ## IT; AN EVICTED IDENTIFIER JUST GETS A NEW TOKEN NEXT TIME.   ##
+    ## OrderedDict POPS ITS OLDEST ENTRY IN O(1); A PLAIN dict KEEPS ##
+    ## THE DELETED SLOTS AT ITS FRONT AND MAKES EACH EVICTION O(n). ##
+    ## PASS THE SAME TABLE TO SEVERAL LEXERS TO SHARE IT ACROSS A   ##
+    ## COMPILATION SESSION. ##
+
+
+class TokenTable:
+    BLOCK_SIZE = 4096
+    block_tags = None
+    block_offsets = None
+    block_lines = None
+    block_values = None
+    starts = None
+    base_offsets = None
+    base_lines = None
+    size = 0
+
+    def __init__(self):
+        self.block_tags = []
+        self.block_offsets = []
+        self.block_lines = []
+        self.block_values = []
+        self.starts = array("q")
+        self.base_offsets = array("q")
+        self.base_lines = array("q")
+        self.size = 0
+
+    def append(self, token, offset, line):
+        if not self.block_tags or len(self.block_tags[-1]) >= self.BLOCK_SIZE:
+            self.block_tags.append(array("i"))
+            self.block_offsets.append(array("i"))
+            self.block_lines.append(array("i"))
+            self.block_values.append([])
+            self.starts.append(self.size)
+            self.base_offsets.append(offset)
+            self.base_lines.append(line)
+        self.block_tags[-1].append(token.tag)
+        self.block_offsets[-1].append(offset - self.base_offsets[-1])
+        self.block_lines[-1].append(line - self.base_lines[-1])
+        self.block_values[-1].append(token.value)
+        self.size += 1
+
+    def __len__(self):
+        return self.size
+
+    def locate(self, i):
+        if i < 0:
+            i += self.size
+        if not 0 <= i < self.size:
+            raise IndexError("token index out of range")
+        k = bisect_right(self.starts, i) - 1
+        return k, i - self.starts[k]
+
+    def __getitem__(self, i):
+        k, j = self.locate(i)
+        return Token(self.block_tags[k][j], self.block_values[k][j])
+
+    def tag(self, i):
+        k, j = self.locate(i)
+        return self.block_tags[k][j]
+
+    def offset(self, i):
+        k, j = self.locate(i)
+        return self.base_offsets[k] + self.block_offsets[k][j]
+
+    def line(self, i):
+        k, j = self.locate(i)
+        return self.base_lines[k] + self.block_lines[k][j]
+
+    def find(self, offset, low=0):
+        k = bisect_left(self.base_offsets, offset)
+        if k > 0:
+            j = bisect_left(
+                self.block_offsets[k - 1], offset - self.base_offsets[k - 1]
+            )
+            if j < len(self.block_offsets[k - 1]):
+                return max(low, self.starts[k - 1] + j)
+        return max(low, self.starts[k] if k < len(self.starts) else self.size)
+
+    ## THE TOKENS ARE STORED IN BLOCKS OF AT MOST BLOCK_SIZE. EACH    ##
+    ## BLOCK KEEPS ITS tags, values AND ITS offsets AND lines RELATIVE ##
+    ## TO ITS base_offsets AND base_lines ENTRY, WHICH LIES BETWEEN THE ##
+    ## LAST TOKEN OF THE BLOCK BEFORE AND ITS OWN FIRST TOKEN; starts  ##
+    ## HOLDS THE INDEX OF THAT FIRST TOKEN. A TOKEN IS FOUND BY INDEX ##
+    ## (locate) OR BY OFFSET (find: THE FIRST TOKEN STARTING AT OR     ##
+    ## AFTER IT) WITH ONE BISECT OVER THE BLOCKS AND ONE INSIDE A      ##
+    ## BLOCK. ##
+
+    @property
+    def tags(self):
+        return array("i", chain.from_iterable(self.block_tags))
+
+    @property
+    def offsets(self):
+        column = array("i")
+        for base, offsets in zip(self.base_offsets, self.block_offsets):
+            column.extend(map(base.__add__, offsets))
+        return column
+
+    @property
+    def lines(self):
+        column = array("i")
+        for base, lines in zip(self.base_lines, self.block_lines):
+            column.extend(map(base.__add__, lines))
+        return column
+
+    @property
+    def values(self):
+        return list(chain.from_iterable(self.block_values))
+
+    ## tags, offsets (CHARACTERS FROM THE START OF THE SOURCE), lines ##
+    ## AND values ARE THE WHOLE COLUMNS AS NEW array/list OBJECTS, SO ##
+    ## NO Token OBJECT IS KEPT PER TOKEN. EACH READ COPIES THE TABLE. ##
+
+    def edge(self, i):
+        if i < self.size:
+            return self.locate(i)
+        return len(self.block_tags) - 1, len(self.block_tags[-1])
+
+    def replace(self, first, last, tokens, offset_delta, line_delta):
+        if self.block_tags:
+            k, i = self.edge(first)
+            m, j = self.edge(last)
+            count = len(self.block_tags[k]) + len(tokens) - (j - i)
+            if k == m and (i > 0 or k > 0) and 0 < count <= 2 * self.BLOCK_SIZE:
+                self.patch(k, i, j, tokens, offset_delta, line_delta)
+                if count > self.BLOCK_SIZE:
+                    self.split(k)
+                    k += 1
+                self.shift(
+                    k + 1, len(tokens) - (last - first), offset_delta, line_delta
+                )
+                return
+
+            ## AN EDIT INSIDE ONE BLOCK THAT LEAVES IT NON-EMPTY IS      ##
+            ## PATCHED IN PLACE, AND THE BLOCK IS SPLIT IN HALVES IF IT  ##
+            ## GROWS PAST BLOCK_SIZE. THE BASES ARE KEPT: THE NEW AND    ##
+            ## MOVED TOKENS START AT OR AFTER THE OLD TOKEN first, SO    ##
+            ## THEY STAY AT OR AFTER THE BASE OF THE BLOCK. AN EDIT AT   ##
+            ## THE VERY FIRST TOKEN CAN MOVE TOKENS BEFORE IT, SO THAT   ##
+            ## ONE REBUILDS THE BLOCK. ##
+
+            base = self.base_offsets[k]
+            line = self.base_lines[k]
+            after = self.base_offsets[m] + offset_delta
+            line_after = self.base_lines[m] + line_delta
+            tags = self.block_tags[k][:i] + tokens.tags + self.block_tags[m][j:]
+            offsets = (
+                array("i", map(base.__add__, self.block_offsets[k][:i]))
+                + tokens.offsets
+                + array("i", map(after.__add__, self.block_offsets[m][j:]))
+            )
+            lines = (
+                array("i", map(line.__add__, self.block_lines[k][:i]))
+                + tokens.lines
+                + array("i", map(line_after.__add__, self.block_lines[m][j:]))
+            )
+            values = self.block_values[k][:i] + tokens.values + self.block_values[m][j:]
+        else:
+            k = 0
+            m = -1
+            tags = tokens.tags
+            offsets = tokens.offsets
+            lines = tokens.lines
+            values = tokens.values
+
+        ## OTHERWISE THE BLOCKS HOLDING first AND last ARE REBUILT:   ##
+        ## THE TOKENS OF THE FIRST ONE BEFORE first, THE NEW TOKENS   ##
+        ## AND THE TOKENS OF THE LAST ONE FROM last ON, MOVED.        ##
+
+        count = len(tags)
+        parts = -(-count // self.BLOCK_SIZE)
+        size = -(-count // parts) if parts else 0
+        start = self.starts[k] if k < len(self.starts) else 0
+        new_tags = []
+        new_offsets = []
+        new_lines = []
+        new_values = []
+        new_starts = array("q")
+        new_bases = array("q")
+        new_line_bases = array("q")
+        for a in range(0, count, size or 1):
+            base = offsets[a]
+            line = lines[a]
+            new_tags.append(tags[a : a + size])
+            new_offsets.append(array("i", map((-base).__add__, offsets[a : a + size])))
+            new_lines.append(array("i", map((-line).__add__, lines[a : a + size])))
+            new_values.append(values[a : a + size])
+            new_starts.append(start + a)
+            new_bases.append(base)
+            new_line_bases.append(line)
+
+        self.block_tags[k : m + 1] = new_tags
+        self.block_offsets[k : m + 1] = new_offsets
+        self.block_lines[k : m + 1] = new_lines
+        self.block_values[k : m + 1] = new_values
+        self.starts[k : m + 1] = new_starts
+        self.base_offsets[k : m + 1] = new_bases
+        self.base_lines[k : m + 1] = new_line_bases
+
+        self.shift(
+            k + len(new_tags), len(tokens) - (last - first), offset_delta, line_delta
+        )
+
+    ## REPLACES TOKENS first:last WITH tokens AND MOVES EVERY LATER   ##
+    ## TOKEN BY offset_delta CHARACTERS AND line_delta LINES. THE     ##
+    ## LATER BLOCKS ONLY HAVE THEIR start AND BASES MOVED, SO AN EDIT ##
+    ## COSTS O(BLOCK_SIZE + len(tokens) + NUMBER OF BLOCKS) WHEREVER  ##
+    ## IT IS. ##
+
+    def patch(self, k, i, j, tokens, offset_delta, line_delta):
+        offsets = self.block_offsets[k][j:]
+        if offset_delta != 0:
+            offsets = array("i", map(offset_delta.__add__, offsets))
+        lines = self.block_lines[k][j:]
+        if line_delta != 0:
+            lines = array("i", map(line_delta.__add__, lines))
+        base = -self.base_offsets[k]
+        line = -self.base_lines[k]
+        self.block_offsets[k][i:] = (
+            array("i", map(base.__add__, tokens.offsets)) + offsets
+        )
+        self.block_lines[k][i:] = array("i", map(line.__add__, tokens.lines)) + lines
+        self.block_tags[k][i:j] = tokens.tags
+        self.block_values[k][i:j] = tokens.values
+
+    def split(self, k):
+        half = len(self.block_tags[k]) // 2
+        base = self.block_offsets[k][half]
+        line = self.block_lines[k][half]
+        self.block_tags.insert(k + 1, self.block_tags[k][half:])
+        self.block_offsets.insert(
+            k + 1, array("i", map((-base).__add__, self.block_offsets[k][half:]))
+        )
+        self.block_lines.insert(
+            k + 1, array("i", map((-line).__add__, self.block_lines[k][half:]))
+        )
+        self.block_values.insert(k + 1, self.block_values[k][half:])
+        self.starts.insert(k + 1, self.starts[k] + half)
+        self.base_offsets.insert(k + 1, self.base_offsets[k] + base)
+        self.base_lines.insert(k + 1, self.base_lines[k] + line)
+        del self.block_tags[k][half:]
+        del self.block_offsets[k][half:]
+        del self.block_lines[k][half:]
+        del self.block_values[k][half:]
+
+    ## MOVES THE SECOND HALF OF BLOCK k INTO A NEW BLOCK AFTER IT,   ##
+    ## WHOSE BASE IS ITS FIRST TOKEN. ##
+
+    def shift(self, block, count_delta, offset_delta, line_delta):
+        if count_delta != 0:
+            self.starts[block:] = array(
+                "q", map(count_delta.__add__, self.starts[block:])
+            )
+        if offset_delta != 0:
+            self.base_offsets[block:] = array(
+                "q", map(offset_delta.__add__, self.base_offsets[block:])
+            )
+        if line_delta != 0:
+            self.base_lines[block:] = array(
+                "q", map(line_delta.__add__, self.base_lines[block:])
+            )
+        self.size += count_delta
+
+
+class SourceText:
+    PIECE_SIZE = 8192
+    pieces = None
+    starts = None
+    length = 0
+
+    def __init__(self, text=""):
+        size = self.PIECE_SIZE
+        self.pieces = [text[i : i + size] for i in range(0, len(text), size)] or [""]
+        self.starts = array("q", range(0, len(self.pieces) * size, size))
+        self.length = len(text)
+
+    def __len__(self):
+        return self.length
+
+    def __str__(self):
+        return "".join(self.pieces)
+
+    def locate(self, offset):
+        k = bisect_right(self.starts, offset) - 1
+        return k, offset - self.starts[k]
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            return self[key : key + 1 or None]
+        start, stop, step = key.indices(self.length)
+        if step != 1:
+            raise ValueError("SourceText slices must be contiguous")
+        parts = []
+        k, i = self.locate(start)
+        while start < stop:
+            part = self.pieces[k][i : i + stop - start]
+            parts.append(part)
+            start += len(part)
+            k += 1
+            i = 0
+        return "".join(parts)
+
+    def rfind(self, character, start=0, end=None):
+        end = self.length if end is None else end
+        k, i = self.locate(end)
+        while k >= 0:
+            base = self.starts[k]
+            found = self.pieces[k].rfind(character, max(start - base, 0), i)
+            if found >= 0:
+                return base + found
+            if base <= start:
+                break
+            k -= 1
+            i = len(self.pieces[k])
+        return -1
+
+    ## ENOUGH OF THE str INTERFACE FOR StringSource AND relex: SLICES  ##
+    ## JOIN ONLY THE PIECES THEY COVER AND rfind (OF ONE CHARACTER)    ##
+    ## WALKS THE PIECES BACKWARDS FROM end. ##
+
+    def edit(self, start, end, replacement):
+        if not 0 <= start <= end <= self.length:
+            raise ValueError("Edit range out of bounds")
+        k, i = self.locate(start)
+        m, j = self.locate(end)
+        text = self.pieces[k][:i] + replacement + self.pieces[m][j:]
+
+        size = self.PIECE_SIZE
+        if len(text) > 2 * size:
+            pieces = [text[a : a + size] for a in range(0, len(text), size)]
+        elif text or m - k + 1 == len(self.pieces):
+            pieces = [text]
+        else:
+            pieces = []
+
+        starts = array("q")
+        position = self.starts[k]
+        for piece in pieces:
+            starts.append(position)
+            position += len(piece)
+        delta = len(replacement) - (end - start)
+        tail = self.starts[m + 1 :]
+        if delta != 0:
+            tail = array("q", map(delta.__add__, tail))
+
+        self.pieces[k : m + 1] = pieces
+        self.starts[k:] = starts + tail
+        self.length += delta
+
+    ## A SOURCE KEPT AS PIECES OF ABOUT PIECE_SIZE CHARACTERS. AN EDIT ##
+    ## REBUILDS ONLY THE PIECES IT TOUCHES AND MOVES THE START OF THE  ##
+    ## LATER ONES, SO IT COSTS O(PIECE_SIZE + len(replacement) +       ##
+    ## NUMBER OF PIECES) INSTEAD OF COPYING THE WHOLE TEXT. ##
+
+
+class FileSource:
+    file = None
+    map = None
+    view = None
+    decoder = None
+    buffer_size = 0
+    position = 0
+
+    def __init__(self, file_path, buffer_size=1014, use_mmap=False, encoding="utf-8"):
+        self.buffer_size = buffer_size
+        self.position = 0
+
+        if not use_mmap:
+            self.file = open(file_path, "r", encoding=encoding)
+            return
+
+        self.file = open(file_path, "rb")
+        self.decoder = io.IncrementalNewlineDecoder(
+            codecs.getincrementaldecoder(encoding)(), translate=True
+        )
+        try:
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.view = memoryview(self.map)
+        except ValueError:
+            self.map = None
+
+        ## EMPTY FILES CANNOT BE MAPPED, THEY SIMPLY YIELD NO CHUNKS. ##
+
+    def read(self):
+        if self.file is None:
+            return ""
+
+        if self.decoder is None:
+            return self.file.read(self.buffer_size)
+
+        text = ""
+        while text == "":
+            if self.map is None or self.position >= len(self.map):
+                return self.decoder.decode(b"", final=True)
+
+            chunk = self.view[self.position : self.position + self.buffer_size]
+            self.position += len(chunk)
+            text = self.decoder.decode(chunk)
+        return text
+
+    ## THE MAPPED PAGES ARE DECODED STRAIGHT FROM THE memoryview, SO ##
+    ## NO INTERMEDIATE bytes COPY IS MADE. THE INCREMENTAL DECODER   ##
+    ## KEEPS MULTIBYTE CHARACTERS SPLIT ACROSS CHUNKS INTACT, AND A  ##
+    ## CHUNK THAT ENDS MID-CHARACTER IS NEVER MISTAKEN FOR EOF.      ##
+    ## LIKE THE TEXT-MODE PATH, "\r\n" AND "\r" BECOME "\n" (A "\r"   ##
+    ## AT THE END OF A CHUNK WAITS FOR THE NEXT ONE). ##
+
+    def close(self):
+        if self.view is not None:
+            self.view.release()
+            self.view = None
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+class StringSource:
+    text = None
+    buffer_size = 0
+    position = 0
+
+    def __init__(self, text, buffer_size=1014, position=0):
+        self.text = text
+        self.buffer_size = buffer_size
+        self.position = position
+
+    def read(self):
+        chunk = self.text[self.position : self.position + self.buffer_size]
+        self.position += len(chunk)
+        return chunk
+
+    def close(self):
+        pass
+
+
 class Lexer:
     file_path = None
-    position = 0
+    source = None
     buffer_size = 0
     current_buffer = None
     next_buffer = None
-    words = {}
+    index = 0
+    pending = None
+    lexemes = None
+    symbols = None
+    recover = False
+    diagnostics = None
     line = 0
+    offset = 0
+    line_start = 0
+    previous_line_start = 0
+    token_offset = 0
+    token_line = 0
+    token_column = 0
+
+    def __init__(
+        self,
+        file_path=None,
+        buffer_size=1014,
+        use_mmap=False,
+        source=None,
+        engine="char",
+        symbols=None,
+        recover=False,
+    ):
+        if engine not in ("char", "regex"):
+            raise ValueError("Unknown scan engine: " + str(engine))
 
-    def __init__(self, file_path, buffer_size=1014):
         self.file_path = file_path
         self.buffer_size = buffer_size
-        self.position = 0
         self.current_buffer = ""
         self.next_buffer = ""
+        self.index = 0
+        self.pending = []
         self.line = 1
+        self.offset = 0
+        self.line_start = 0
+        self.previous_line_start = 0
+        self.token_offset = 0
+        self.token_line = 1
+        self.token_column = 1
 
-        with open(self.file_path, "r") as file:
-            file.seek(self.position)
-            self.current_buffer = file.read(self.buffer_size)
-            self.next_buffer = file.read(self.buffer_size)
-            self.position += self.buffer_size
-
-        self.words["VAR"] = Token(Tag.VAR, "VAR")
-        self.words["FORWARD"] = Token(Tag.FORWARD, "FORWARD")
-        self.words["FD"] = Token(Tag.FORWARD, "FORWARD")
-        self.words["BACKWARD"] = Token(Tag.BACKWARD, "BACKWARD")
-        self.words["BK"] = Token(Tag.BACKWARD, "BACKWARD")
-        self.words["RIGHT"] = Token(Tag.RIGHT, "RIGHT")
-        self.words["RT"] = Token(Tag.RIGHT, "RIGHT")
-        self.words["LEFT"] = Token(Tag.LEFT, "LEFT")
-        self.words["LT"] = Token(Tag.LEFT, "LEFT")
-        self.words["SETX"] = Token(Tag.SETX, "SETX")
-        self.words["SETY"] = Token(Tag.SETY, "SETY")
-        self.words["SETXY"] = Token(Tag.SETXY, "SETXY")
-        self.words["HOME"] = Token(Tag.HOME, "HOME")
-        self.words["CLEAR"] = Token(Tag.CLEAR, "CLEAR")
-        self.words["CLS"] = Token(Tag.CLS, "CLS")
-        self.words["CIRCLE"] = Token(Tag.CIRCLE, "CIRCLE")
-        self.words["ARC"] = Token(Tag.ARC, "ARC")
-        self.words["PENUP"] = Token(Tag.PENUP, "PENUP")
-        self.words["PU"] = Token(Tag.PENUP, "PENUP")
-        self.words["PENDOWN"] = Token(Tag.PENDOWN, "PENDOWN")
-        self.words["PD"] = Token(Tag.PENDOWN, "PENDOWN")
-        self.words["COLOR"] = Token(Tag.COLOR, "COLOR")
-        self.words["PENWIDTH"] = Token(Tag.PENWIDTH, "PENWIDTH")
-        self.words["PRINT"] = Token(Tag.PRINT, "PRINT")
-        self.words["WHILE"] = Token(Tag.WHILE, "WHILE")
-        self.words["IF"] = Token(Tag.IF, "IF")
-        self.words["IFELSE"] = Token(Tag.IFELSE, "IFELSE")
-        self.words["OR"] = Token(Tag.OR, "OR")
-        self.words["AND"] = Token(Tag.AND, "AND")
-        self.words["MOD"] = Token(Tag.MOD, "MOD")
+        if symbols is None:
+            symbols = SymbolTable()
+        self.symbols = symbols
+        self.recover = recover
+        self.diagnostics = []
+
+        if source is None:
+            source = FileSource(self.file_path, self.buffer_size, use_mmap)
+        self.source = source
+
+        self.current_buffer = self.source.read()
+        self.next_buffer = self.source.read()
+        if len(self.next_buffer) == 0:
+            self.source.close()
+
+        if engine == "regex":
+            self.lexemes = self.generate_regex()
+            self.scan = self.lexemes.__next__
 
     def get_next_character(self):
-        if len(self.current_buffer) == 0 and len(self.next_buffer) > 0:
-            self.current_buffer = self.next_buffer
-            with open(self.file_path, "r") as file:
-                file.seek(self.position)
-                self.next_buffer = file.read(self.buffer_size)
-                self.position += self.buffer_size
+        if self.pending:
+            character = self.pending.pop()
+        else:
+            if self.index >= len(self.current_buffer):
+                if len(self.next_buffer) == 0:
+                    return None
+                self.current_buffer = self.next_buffer
+                self.index = 0
+                self.next_buffer = self.source.read()
+                if len(self.next_buffer) == 0:
+                    self.source.close()
 
-        if len(self.current_buffer) > 0:
-            character = self.current_buffer[0]
-            self.current_buffer = self.current_buffer[1:]
+            character = self.current_buffer[self.index]
+            self.index += 1
 
-            if character == "\n":
-                self.line += 1
-            return character
+        self.offset += 1
+        if character == "\n":
+            self.line += 1
+            self.previous_line_start = self.line_start
+            self.line_start = self.offset
+        return character
 
-        return None
+    ## THE FORWARD POINTER ONLY MOVES INSIDE current_buffer; WHEN IT ##
+    ## RUNS PAST THE END THE TWO BUFFERS ARE SWAPPED AND THE SPARE   ##
+    ## ONE IS REFILLED, SO EVERY CHARACTER COSTS O(1) INSTEAD OF     ##
+    ## COPYING THE REST OF THE BUFFER. ##
 
     def push_back(self, character):
+        if character is None:
+            return
+        self.offset -= 1
         if character == "\n":
             self.line -= 1
-        self.current_buffer = character + self.current_buffer
+            self.line_start = self.previous_line_start
+        if (
+            not self.pending
+            and self.index > 0
+            and self.current_buffer[self.index - 1] == character
+        ):
+            self.index -= 1
+        else:
+            self.pending.append(character)
+
+    ## RETREATING IS JUST index -= 1. ONLY WHEN THE CHARACTER WAS   ##
+    ## READ FROM THE PREVIOUS BUFFER (JUST SWAPPED OUT) OR DIFFERS  ##
+    ## FROM WHAT WAS READ ('#' UPPERCASES ITS LOOKAHEAD) IT GOES TO ##
+    ## THE SMALL pending STACK. ##
+
+    def __iter__(self):
+        scan = self.scan
+        token = scan()
+        while token.tag != Tag.EOF:
+            yield token
+            token = scan()
+
+    def tokenize_all(self):
+        table = TokenTable()
+        for token in self:
+            table.append(token, self.token_offset, self.token_line)
+        return table
+
+    ## token_offset, token_line AND token_column (1-BASED) ALWAYS ##
+    ## DESCRIBE WHERE THE TOKEN JUST RETURNED BY scan STARTS. ##
+
+    @classmethod
+    def relex(cls, text, table, start, end, replacement, **options):
+        if not 0 <= start <= end <= len(text):
+            raise ValueError("Edit range out of bounds")
+
+        if isinstance(text, SourceText):
+            new_text = text
+            new_text.edit(start, end, replacement)
+        else:
+            new_text = text[:start] + replacement + text[end:]
+        delta = len(replacement) - (end - start)
+        edit_end = start + len(replacement)
+
+        first = table.find(start) - 1
+        while first >= 0 and table.tag(first) == ord("\n"):
+            first -= 1
+
+        ## RESTART AT THE LAST TOKEN THAT STARTS BEFORE THE EDIT: THE ##
+        ## ONE-CHARACTER LOOKAHEAD OF THE TOKEN BEFORE IT NEVER REACHES ##
+        ## THE EDIT. A NEWLINE TOKEN IS THE END OF A COMMENT, NOT A    ##
+        ## REAL RESTART POINT, SO THOSE ARE SKIPPED. ##
+
+        if first < 0:
+            first = 0
+            restart = 0
+            line = 1
+        else:
+            restart = table.offset(first)
+            line = table.line(first)
+
+        lexer = cls(source=StringSource(new_text, position=restart), **options)
+        lexer.offset = restart
+        lexer.line = line
+        lexer.line_start = new_text.rfind("\n", 0, restart) + 1
+
+        rescanned = TokenTable()
+        last = len(table)
+        line_delta = 0
+        for token in lexer:
+            offset = lexer.token_offset
+            if offset >= edit_end:
+                old = table.find(offset - delta, first)
+                if old < len(table) and table.offset(old) == offset - delta:
+                    last = old
+                    line_delta = lexer.token_line - table.line(old)
+                    break
+            rescanned.append(token, offset, lexer.token_line)
+        lexer.close()
+
+        ## ONCE A NEW TOKEN STARTS PAST THE EDIT AT THE SAME PLACE AS  ##
+        ## AN OLD ONE, THE REST OF THE TEXT IS IDENTICAL AND THE LEXER ##
+        ## HOLDS NO STATE BETWEEN TOKENS, SO THE OLD TAIL IS REUSED.   ##
+
+        table.replace(first, last, rescanned, delta, line_delta)
+        return new_text
+
+    ## APPLIES THE EDIT text[start:end] = replacement TO A TokenTable ##
+    ## PRODUCED BY tokenize_all OVER text, IN PLACE, AND RETURNS THE  ##
+    ## NEW TEXT. ONLY THE TOKENS BETWEEN THE RESTART POINT AND THE    ##
+    ## RESYNCHRONIZATION POINT ARE SCANNED AGAIN. A SourceText IS     ##
+    ## EDITED IN PLACE AND RETURNED; A str IS COPIED WHOLE ON EVERY   ##
+    ## EDIT, WHICH COSTS O(len(text)) (ABOUT 10 ms FOR 10 MB), SO     ##
+    ## EDITORS SHOULD KEEP LARGE SOURCES IN A SourceText. ##
+
+    def error(self, message):
+        error = LexicalError(message, self.token_line, self.token_column)
+        if not self.recover:
+            raise error
+        self.diagnostics.append(error)
+        return Token(Tag.ERROR, message, self.token_line, self.token_column)
+
+    ## WITH recover=True A LEXICAL ERROR BECOMES A Tag.ERROR TOKEN  ##
+    ## AND IS COLLECTED IN diagnostics, AND SCANNING CONTINUES AFTER ##
+    ## THE BAD LEXEME; OTHERWISE A LexicalError IS RAISED. ##
+
+    def close(self):
+        self.source.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
     def scan(self):
         while True:
             character = self.get_next_character()
 
             if character is None:
-                return Token(Tag.EOF)
+                return EOF_TOKEN
 
             if character.isspace():
                 continue
@@ -174,50 +892,60 @@ class Lexer:
                     if character == "\n":
                         break
                     if character is None:
-                        return Token(Tag.EOF)
+                        return EOF_TOKEN
 
             ## DETECTS THE '%' SYMBOL IN A CHARACTER SEQUENCE AND,   ##
             ## IF FOUND, DISCARDS ALL CHARACTERS UNTIL A NEWLINE     ##
             ## OR THE END OF THE SEQUENCE IS REACHED, THEN CONTINUES ##
             ## WITH THE NEXT ITERATION OF THE LOOP. ##
 
+            self.token_offset = self.offset - 1
+            if character == "\n":
+                self.token_line = self.line - 1
+                self.token_column = self.token_offset - self.previous_line_start + 1
+            else:
+                self.token_line = self.line
+                self.token_column = self.token_offset - self.line_start + 1
+
             if character == "<":
                 character = self.get_next_character()
                 if character in ["=", ">"]:
                     if character == "=":
-                        return Token(Tag.LEQ, "<=")
+                        return FIXED_TOKENS["<="]
                     else:
-                        return Token(Tag.NEQ, "<>")
+                        return FIXED_TOKENS["<>"]
                 else:
                     self.push_back(character)
-                    return Token(ord("<"))
+                    return FIXED_TOKENS["<"]
 
             if character == ">":
                 character = self.get_next_character()
                 if character == "=":
-                    return Token(Tag.GEQ, ">=")
+                    return FIXED_TOKENS[">="]
                 else:
                     self.push_back(character)
-                    return Token(ord(">"))
+                    return FIXED_TOKENS[">"]
 
             if character == "#":
-                character = self.get_next_character().upper()
+                character = self.get_next_character()
+                if character is not None:
+                    character = character.upper()
                 if character in ["T", "F"]:
                     if character == "T":
-                        return Token(Tag.TRUE, "#T")
+                        return FIXED_TOKENS["#T"]
                     else:
-                        return Token(Tag.FALSE, "#F")
+                        return FIXED_TOKENS["#F"]
                 else:
                     self.push_back(character)
-                    return Token(ord("#"))
+                    return FIXED_TOKENS["#"]
 
             if character == ":":
                 character = self.get_next_character()
                 if character == "=":
-                    return Token(Tag.ASSIGN, ":=")
+                    return FIXED_TOKENS[":="]
                 else:
                     self.push_back(character)
-                    return Token(ord(":"))
+                    return FIXED_TOKENS[":"]
 
             if character == '"':
                 text = ""
@@ -226,59 +954,193 @@ class Lexer:
                     character = self.get_next_character()
                     if character == '"':
                         break
+                    if character is None:
+                        return self.error("Unterminated string.")
                 text += character
-                return Token(Tag.STRING, text)
+                return Token(Tag.STRING, text, self.token_line, self.token_column)
 
-            if character.isdigit():
-                value = 0.0
+            if character.isdecimal():
+                number = ""
                 while True:
-                    value = (value * 10) + int(character)
+                    number += character
                     character = self.get_next_character()
-                    if not character.isdigit():
-                        break
                     if character == ".":
+                        number += character
                         character = self.get_next_character()
-                        if character.isdigit():
-                            decimal_part = 0.0
-                            decimal_place = 1
+                        if character is not None and character.isdecimal():
                             while True:
-                                decimal_part = (decimal_part * 10) + int(character)
+                                number += character
                                 character = self.get_next_character()
-                                if not character.isdigit():
+                                if character is None or not character.isdecimal():
                                     break
-                                decimal_place *= 10
-                            value += decimal_part / decimal_place
+                            break
                         else:
                             self.push_back(character)
-                            raise Exception(
-                                "Lexical exception: Caracter after '.' is not a digit."
-                            )
+                            return self.error("Caracter after '.' is not a digit.")
+                    if character is None or not character.isdecimal():
+                        break
 
                 ## CHECKS IF A CHARACTER IS A '.' AND THEN HANDLES DECIMAL ##
-                ## NUMBER PARSING. IF THE NEXT CHARACTER IS A DIGIT, IT    ##
-                ## CONVERTS THE SEQUENCE INTO A FLOATING-POINT NUMBER BY   ##
-                ## CONTINUOUSLY ADDING DIGITS DIVIDED BY AN INCREASING     ##
-                ## POWER OF TEN UNTIL NO MORE DIGITS ARE FOUND. IF THE     ##
-                ## NEXT CHARACTER AFTER THE '.' IS NOT A DIGIT, IT RAISES  ##
-                ## A 'LEXICAL EXCEPTION'. ##
+                ## NUMBER PARSING. IF THE NEXT CHARACTER IS A DIGIT, THE   ##
+                ## DIGITS AFTER THE '.' ARE COLLECTED UNTIL NO MORE ARE    ##
+                ## FOUND. IF THE NEXT CHARACTER AFTER THE '.' IS NOT A     ##
+                ## DIGIT, IT REPORTS A LEXICAL ERROR. ##
 
                 self.push_back(character)
-                return Token(Tag.NUMBER, value)
+                return Token(
+                    Tag.NUMBER, float(number), self.token_line, self.token_column
+                )
+
+            ## THE VALUE IS float OF THE WHOLE LITERAL, CORRECTLY ROUNDED ##
+            ## AND IDENTICAL TO THE REGEX ENGINE'S; ADDING ONE DIGIT AT A ##
+            ## TIME ROUNDED LITERALS OF MORE THAN 15 DIGITS DIFFERENTLY.  ##
 
-            if character.isalpha():
+            if character.isalnum():
                 lexem = ""
                 while True:
                     lexem += character.upper()
                     character = self.get_next_character()
-                    if not character.isalnum():
+                    if character is None or not character.isalnum():
                         break
                 self.push_back(character)
 
-                if lexem in self.words:
-                    return self.words[lexem]
+                if lexem in KEYWORDS:
+                    return KEYWORDS[lexem]
+                return self.symbols.get(lexem)
+
+            if character in FIXED_TOKENS:
+                return FIXED_TOKENS[character]
+            return Token(ord(character), None, self.token_line, self.token_column)
+
+    def generate_regex(self):
+        symbols = self.symbols.get
+        interned = self.symbols.tokens.get
+        keywords = dict(KEYWORDS).get
+        NUMBER = Tag.NUMBER
+        STRING = Tag.STRING
+        NEWLINE = FIXED_TOKENS["\n"]
+
+        known = {
+            lexeme: token
+            for lexeme, token in FIXED_TOKENS.items()
+            if lexeme not in ("%", '"')
+        }
+        known["#t"] = FIXED_TOKENS["#T"]
+        known["#f"] = FIXED_TOKENS["#F"]
+        known_get = known.get
+
+        ## LOOKUPS ARE BOUND ONCE: known HOLDS EVERY FIXED LEXEME AND   ##
+        ## EACH SPELLING OF A KEYWORD ALREADY SEEN, AND IDENTIFIERS     ##
+        ## ALREADY IN THE SYMBOL TABLE ARE READ WITHOUT A METHOD CALL. ##
+        ## A LONE '%' IS AN EMPTY COMMENT AND A LONE '"' AN            ##
+        ## UNTERMINATED STRING, SO NEITHER IS IN known. ##
+
+        def error(message, position, line, line_start):
+            if not self.recover:
+                self.index += position - self.offset
+                self.offset = position
+                self.line = line
+                self.line_start = line_start
+                self.lexemes = self.generate_regex()
+                self.scan = self.lexemes.__next__
+            return self.error(message)
+
+        ## A LexicalError RAISED HERE ENDS THIS GENERATOR, SO BEFORE   ##
+        ## RAISING IT THE POSITION AFTER THE BAD LEXEME IS SAVED AND A ##
+        ## NEW GENERATOR TAKES OVER scan: THE NEXT CALL CONTINUES THERE ##
+        ## AS THE char ENGINE DOES. ##
+
+        while True:
+            buffer = self.current_buffer
+            more = len(self.next_buffer) > 0
+            matches = LEXEME.findall(buffer, self.index)
+            matches.pop()
+
+            if more and matches and matches[-1][1]:
+                matches.pop()
+
+            ## findall ALWAYS ENDS WITH AN EMPTY MATCH, WHICH IS DROPPED.  ##
+            ## WITH MORE INPUT PENDING A LEXEME THAT REACHES THE END OF    ##
+            ## THE BUFFER MAY CONTINUE IN next_buffer (OR NEED IT AS       ##
+            ## LOOKAHEAD), SO IT IS LEFT UNCONSUMED AND RESCANNED AFTER    ##
+            ## THE BUFFERS ARE JOINED. TRAILING WHITESPACE IS CONSUMED, SO ##
+            ## ONLY THAT LEXEME IS EVER CARRIED OVER. ##
+
+            position = self.offset
+            line = self.line
+            line_start = self.line_start
+            for space, lexeme in matches:
+                if space:
+                    if "\n" in space:
+                        line += space.count("\n")
+                        line_start = position + space.rindex("\n") + 1
+                    position += len(space)
+                    if not lexeme:
+                        continue
+                self.token_offset = position
+                self.token_line = line
+                self.token_column = column = position - line_start + 1
+                position += len(lexeme)
+
+                token = known_get(lexeme)
+                if token is not None:
+                    yield token
+                    continue
+
+                first = lexeme[0]
+                if first.isalnum():
+                    if first.isdecimal():
+                        if lexeme[-1] == ".":
+                            yield error(
+                                "Caracter after '.' is not a digit.",
+                                position,
+                                line,
+                                line_start,
+                            )
+                        else:
+                            yield Token(NUMBER, float(lexeme), line, column)
+                        continue
+                    lexem = lexeme.upper()
+                    token = keywords(lexem)
+                    if token is None:
+                        token = interned(lexem)
+                        yield symbols(lexem) if token is None else token
+                    else:
+                        known[lexeme] = token
+                        yield token
+                elif first == "%":
+                    if lexeme[-1] == "\n":
+                        self.token_offset = position - 1
+                        self.token_column = position - line_start
+                        line += 1
+                        line_start = position
+                        yield NEWLINE
+                elif first == '"':
+                    if "\n" in lexeme:
+                        line += lexeme.count("\n")
+                        line_start = self.token_offset + lexeme.rindex("\n") + 1
+                    if len(lexeme) == 1 or lexeme[-1] != '"':
+                        yield error("Unterminated string.", position, line, line_start)
+                        continue
+                    yield Token(STRING, lexeme, self.token_line, column)
+                else:
+                    yield Token(ord(lexeme), None, line, column)
+
+            self.index += position - self.offset
+            self.offset = position
+            self.line = line
+            self.line_start = line_start
+
+            if not more:
+                while True:
+                    yield EOF_TOKEN
 
-                token = Token(Tag.ID, lexem)
-                self.words[lexem] = token
-                return token
+            self.current_buffer = buffer[self.index :] + self.next_buffer
+            self.index = 0
+            self.next_buffer = self.source.read()
+            if len(self.next_buffer) == 0:
+                self.source.close()
 
-            return Token(ord(character))
+    ## SAME TOKEN STREAM AS scan (INCLUDING THE NEWLINE TOKEN THAT   ##
+    ## FOLLOWS A COMMENT) BUT ONE C-LEVEL findall PER BUFFER INSTEAD ##
+    ## OF ONE get_next_character CALL PER CHARACTER. ##
@@ -0,0 +1,429 @@
+import argparse
+import glob
+import hashlib
+import json
+import os
+import platform
+import random
+import tempfile
+import time
+import tracemalloc
+
+from Lexer import *
+
+SIZES = [
+    1024,
+    10 * 1024,
+    100 * 1024,
+    1024 * 1024,
+    10 * 1024 * 1024,
+    100 * 1024 * 1024,
+]
+
+
+def build_corpus(size, sources="test_cases/good/*.txt"):
+    """
+    Build a Logo program of roughly `size` bytes by repeating the good test cases.
+
+    Args:
+        size (int): The target size in bytes.
+        sources (str): Glob of the programs used as building blocks.
+
+    Returns:
+        str: The generated program, always ending with a newline.
+    """
+
+    block = ""
+    for path in sorted(glob.glob(sources)):
+        with open(path, "r") as file:
+            block += file.read() + "\n"
+
+    repeats = max(1, size // len(block.encode()))
+    return block * repeats
+
+
+TOKEN_TYPES = ["keyword", "id", "number", "string", "comment", "operator"]
+
+OPERATORS = ["<", "<=", "<>", ">", ">=", ":=", "#T", "#F", "(", ")", "[", "]", "+", ","]
+
+
+def generate_program(size, mix=None, seed=0):
+    """
+    Generate a synthetic Logo program with a given mix of token types.
+
+    Args:
+        size (int): The target size in bytes.
+        mix (dict): Relative weight of each entry of TOKEN_TYPES (default: equal).
+        seed (int): Seed for the random generator, so runs are reproducible.
+
+    Returns:
+        str: The generated program, always ending with a newline.
+    """
+
+    mix = mix or {kind: 1 for kind in TOKEN_TYPES}
+    kinds = [kind for kind in TOKEN_TYPES if mix.get(kind, 0) > 0]
+    weights = [mix[kind] for kind in kinds]
+    keywords = list(KEYWORDS)
+    rng = random.Random(seed)
+
+    parts = []
+    length = 0
+    while length < size:
+        for kind in rng.choices(kinds, weights, k=64):
+            if kind == "keyword":
+                lexeme = rng.choice(keywords)
+            elif kind == "id":
+                lexeme = f"V{rng.randrange(500)}"
+            elif kind == "number":
+                lexeme = str(rng.randrange(100000))
+            elif kind == "string":
+                lexeme = '"' + " ".join(rng.choices(keywords, k=3)).lower() + '"'
+            elif kind == "comment":
+                lexeme = "% " + " ".join(rng.choices(keywords, k=5)).lower() + "\n"
+            else:
+                lexeme = rng.choice(OPERATORS)
+            parts.append(lexeme)
+            parts.append("\n" if rng.random() < 0.1 else " ")
+            length += len(lexeme) + 1
+    parts.append("\n")
+    return "".join(parts)
+
+
+## EVERY LEXEME IS FOLLOWED BY A SEPARATOR, SO EACH GENERATED ##
+## TOKEN (PLUS THE NEWLINE TOKEN OF A COMMENT) IS SCANNED ON   ##
+## ITS OWN. ##
+
+
+def scan_all(lexer):
+    count = 0
+    token = lexer.scan()
+    while token.tag != Tag.EOF:
+        count += 1
+        token = lexer.scan()
+    return count
+
+
+def run_scaling(sizes, engine="char"):
+    print(f"{'Size':>12} {'Tokens':>12} {'Seconds':>10} {'us/KB':>10}")
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "corpus.txt")
+        for size in sizes:
+            with open(path, "w") as file:
+                file.write(build_corpus(size))
+            nbytes = os.path.getsize(path)
+
+            start = time.perf_counter()
+            with Lexer(path, engine=engine) as lexer:
+                tokens = scan_all(lexer)
+            elapsed = time.perf_counter() - start
+
+            print(
+                f"{nbytes:>12} {tokens:>12} {elapsed:>10.3f} "
+                f"{elapsed * 1e6 / (nbytes / 1024):>10.1f}"
+            )
+
+
+## A CONSTANT us/KB COLUMN ACROSS SIZES MEANS THE SCAN IS LINEAR ##
+## IN THE INPUT SIZE. ##
+
+
+class ReopeningSource:
+    file_path = None
+    buffer_size = 0
+    position = 0
+
+    def __init__(self, file_path, buffer_size=1014):
+        self.file_path = file_path
+        self.buffer_size = buffer_size
+        self.position = 0
+
+    def read(self):
+        with open(self.file_path, "r") as file:
+            file.seek(self.position)
+            chunk = file.read(self.buffer_size)
+            self.position = file.tell()
+        return chunk
+
+    def close(self):
+        pass
+
+
+## REPRODUCES THE PREVIOUS INPUT PATH (ONE open/seek/close PER ##
+## REFILL) SO IT CAN BE MEASURED AGAINST THE NEW ONES. ##
+
+INPUT_MODES = {
+    "reopen": lambda path: ReopeningSource(path),
+    "handle": lambda path: FileSource(path),
+    "mmap": lambda path: FileSource(path, use_mmap=True),
+}
+
+
+def run_input(size):
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "corpus.txt")
+        with open(path, "w") as file:
+            file.write(build_corpus(size))
+        nbytes = os.path.getsize(path)
+
+        print(f"{'Input':>8} {'Read MB/s':>12} {'Scan MB/s':>12}")
+        for name, make_source in INPUT_MODES.items():
+            source = make_source(path)
+            start = time.perf_counter()
+            while len(source.read()) > 0:
+                pass
+            read_elapsed = time.perf_counter() - start
+            source.close()
+
+            start = time.perf_counter()
+            with Lexer(path, source=make_source(path)) as lexer:
+                scan_all(lexer)
+            scan_elapsed = time.perf_counter() - start
+
+            print(
+                f"{name:>8} {nbytes / 1e6 / read_elapsed:>12.2f} "
+                f"{nbytes / 1e6 / scan_elapsed:>12.2f}"
+            )
+
+
+## "Read" ISOLATES THE INPUT LAYER, "Scan" IS THE WHOLE LEXER. ##
+
+
+WHITESPACE_RUN = 100000
+
+## ONE LEXEME AFTER A WHITESPACE RUN LONGER THAN SEVERAL BUFFERS. ##
+
+
+LONG_NUMBERS = 2000
+
+
+def long_numbers(count, seed=0):
+    rng = random.Random(seed)
+    return "".join(
+        "".join(rng.choices("0123456789", k=rng.randint(15, 40))) + "\n"
+        for _ in range(count)
+    )
+
+
+## LITERALS OF 15 TO 40 DIGITS, PAST WHAT A float HOLDS EXACTLY, ##
+## SO BOTH ENGINES MUST ROUND THEM THE SAME WAY. ##
+
+
+def token_digest(path, engine):
+    digest = hashlib.sha256()
+    with Lexer(path, engine=engine, recover=True) as lexer:
+        for token in lexer:
+            position = (lexer.token_offset, lexer.token_line, lexer.token_column)
+            digest.update(repr((token.tag, token.value, position)).encode())
+        digest.update(repr([str(error) for error in lexer.diagnostics]).encode())
+    return digest.hexdigest()
+
+
+def run_engines(size):
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "corpus.txt")
+        with open(path, "w") as file:
+            file.write(build_corpus(size))
+        spaces_path = os.path.join(folder, "spaces.txt")
+        with open(spaces_path, "w") as file:
+            file.write("FD " + " " * WHITESPACE_RUN + "1\n")
+        numbers_path = os.path.join(folder, "numbers.txt")
+        with open(numbers_path, "w") as file:
+            file.write(long_numbers(LONG_NUMBERS))
+
+        print(
+            f"{'Input':>8} {'Engine':>8} {'Tokens':>12} {'Seconds':>10} {'MB/s':>10}"
+            f" {'Same':>6}"
+        )
+        inputs = (("corpus", path), ("spaces", spaces_path), ("numbers", numbers_path))
+        for name, input_path in inputs:
+            nbytes = os.path.getsize(input_path)
+            expected = token_digest(input_path, "char")
+            for engine in ("char", "regex"):
+                start = time.perf_counter()
+                with Lexer(input_path, engine=engine) as lexer:
+                    tokens = scan_all(lexer)
+                elapsed = time.perf_counter() - start
+                same = "yes" if token_digest(input_path, engine) == expected else "NO"
+
+                print(
+                    f"{name:>8} {engine:>8} {tokens:>12} {elapsed:>10.3f} "
+                    f"{nbytes / 1e6 / elapsed:>10.2f} {same:>6}"
+                )
+
+
+## "spaces" IS A LONG WHITESPACE RUN BETWEEN TWO LEXEMES; ITS TIME ##
+## MUST STAY PROPORTIONAL TO ITS SIZE, LIKE THE CORPUS. "Same" IS   ##
+## yes WHEN THE ENGINE PRODUCES THE SAME TOKENS, VALUES, POSITIONS  ##
+## AND DIAGNOSTICS AS THE char ENGINE. ##
+
+
+def run_memory(size):
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "corpus.txt")
+        with open(path, "w") as file:
+            file.write(build_corpus(size))
+
+        print(f"{'Engine':>8} {'Tokens':>12} {'Peak MB':>10} {'Bytes/token':>12}")
+        for engine in ("char", "regex"):
+            tracemalloc.start()
+            with Lexer(path, engine=engine) as lexer:
+                tokens = list(lexer)
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            print(
+                f"{engine:>8} {len(tokens):>12} {peak / 1e6:>10.2f} "
+                f"{current / len(tokens):>12.1f}"
+            )
+            del tokens
+
+
+## KEEPS EVERY TOKEN ALIVE (AS A PARSER WOULD) AND REPORTS THE ##
+## PEAK AND THE MEMORY STILL HELD PER TOKEN AFTER THE SCAN. ##
+
+
+def measure(path, engine):
+    nbytes = os.path.getsize(path)
+    start = time.perf_counter()
+    with Lexer(path, engine=engine) as lexer:
+        tokens = scan_all(lexer)
+    elapsed = time.perf_counter() - start
+    return tokens, nbytes, elapsed
+
+
+def run_suite(size, mix, seed, json_path=None):
+    mix = mix or {kind: 1 for kind in TOKEN_TYPES}
+    results = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "size": size,
+        "mix": mix,
+        "seed": seed,
+        "engines": {},
+    }
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "corpus.txt")
+        with open(path, "w") as file:
+            file.write(generate_program(size, mix, seed))
+
+        for engine in ("char", "regex"):
+            tokens, nbytes, elapsed = measure(path, engine)
+
+            tracemalloc.start()
+            measure(path, engine)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            per_type = {}
+            for kind in TOKEN_TYPES:
+                kind_path = os.path.join(folder, kind + ".txt")
+                with open(kind_path, "w") as file:
+                    file.write(generate_program(max(size // 4, 1024), {kind: 1}, seed))
+                kind_tokens, _, kind_elapsed = measure(kind_path, engine)
+                per_type[kind] = kind_elapsed * 1e9 / max(kind_tokens, 1)
+
+            results["engines"][engine] = {
+                "tokens": tokens,
+                "bytes": nbytes,
+                "seconds": elapsed,
+                "tokens_per_sec": tokens / elapsed,
+                "bytes_per_sec": nbytes / elapsed,
+                "peak_memory_bytes": peak,
+                "ns_per_token": per_type,
+            }
+
+    if json_path is not None:
+        with open(json_path, "w") as file:
+            json.dump(results, file, indent=2)
+
+    print(
+        f"{'Engine':>8} {'Tokens/s':>12} {'MB/s':>8} {'Peak MB':>8}  "
+        + " ".join(f"{kind:>8}" for kind in TOKEN_TYPES)
+    )
+    for engine, result in results["engines"].items():
+        print(
+            f"{engine:>8} {result['tokens_per_sec']:>12.0f} "
+            f"{result['bytes_per_sec'] / 1e6:>8.2f} "
+            f"{result['peak_memory_bytes'] / 1e6:>8.2f}  "
+            + " ".join(f"{result['ns_per_token'][kind]:>8.0f}" for kind in TOKEN_TYPES)
+        )
+    return results
+
+
+## THE PER-TYPE COLUMNS ARE ns PER TOKEN ON A CORPUS MADE OF ONLY ##
+## THAT TOKEN TYPE. PEAK MEMORY IS MEASURED ON A SEPARATE RUN SO  ##
+## tracemalloc DOES NOT SKEW THE TIMINGS. ##
+
+
+def parse_mix(text):
+    mix = {}
+    for item in text.split(","):
+        kind, weight = item.split("=")
+        if kind not in TOKEN_TYPES:
+            raise argparse.ArgumentTypeError("Unknown token type: " + kind)
+        mix[kind] = float(weight)
+    return mix
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Lexer benchmarks")
+    parser.add_argument(
+        "--max-size",
+        type=int,
+        default=SIZES[-1],
+        help="largest input size in bytes (default: 100 MB)",
+    )
+    parser.add_argument(
+        "--input",
+        action="store_true",
+        help="compare reopen-per-refill, single handle and mmap input",
+    )
+    parser.add_argument(
+        "--engines",
+        action="store_true",
+        help="compare the char and regex scan engines",
+    )
+    parser.add_argument(
+        "--memory",
+        action="store_true",
+        help="measure token memory with tracemalloc",
+    )
+    parser.add_argument(
+        "--suite",
+        action="store_true",
+        help="run the synthetic corpus suite for both engines",
+    )
+    parser.add_argument(
+        "--size",
+        type=int,
+        default=1024 * 1024,
+        help="size of the synthetic corpus in bytes (default: 1 MB)",
+    )
+    parser.add_argument(
+        "--mix",
+        type=parse_mix,
+        default=None,
+        help="token mix, e.g. keyword=3,id=3,number=2,string=1,comment=1,operator=2",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="corpus random seed")
+    parser.add_argument("--json", default=None, help="write suite results to a file")
+    parser.add_argument(
+        "--engine",
+        choices=["char", "regex"],
+        default="char",
+        help="scan engine used by the scaling run",
+    )
+    args = parser.parse_args()
+
+    if args.suite:
+        run_suite(args.size, args.mix, args.seed, args.json)
+    elif args.input:
+        run_input(args.max_size)
+    elif args.engines:
+        run_engines(args.max_size)
+    elif args.memory:
+        run_memory(args.max_size)
+    else:
+        run_scaling([size for size in SIZES if size <= args.max_size], args.engine)
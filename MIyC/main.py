@@ -1,11 +1,114 @@
 from Lexer import *
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import argparse
+import glob
+import os
 import sys
+import time
+
+
+def expand_paths(patterns, extension=".txt"):
+    """
+    Expand files, directories and glob patterns into a sorted list of files.
+
+    Args:
+        patterns (list): Files, directories (searched recursively) or globs.
+        extension (str): Extension of the files taken from directories.
+
+    Returns:
+        list: The unique file paths found.
+    """
+
+    files = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            for root, _, names in os.walk(pattern):
+                files.update(
+                    os.path.join(root, name)
+                    for name in names
+                    if name.endswith(extension)
+                )
+        else:
+            files.update(
+                path
+                for path in glob.glob(pattern, recursive=True)
+                if os.path.isfile(path)
+            )
+    return sorted(files)
+
+
+def lex_file(path, engine="char"):
+    """
+    Lex a whole file in recovery mode and count its tokens.
+
+    Args:
+        path (str): The file to lex.
+        engine (str): The Lexer scan engine.
+
+    Returns:
+        tuple: (path, token count, size in bytes, list of error messages).
+    """
+
+    count = 0
+    try:
+        with Lexer(path, engine=engine, recover=True) as lexer:
+            for _ in lexer:
+                count += 1
+    except Exception as error:
+        return path, count, os.path.getsize(path), [f"{type(error).__name__}: {error}"]
+    return path, count, os.path.getsize(path), [str(d) for d in lexer.diagnostics]
+
+
+def run_batch(paths, jobs=None, engine="char"):
+    files = expand_paths(paths)
+    total_bytes = 0
+    failed = 0
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [executor.submit(lex_file, path, engine) for path in files]
+        for future in as_completed(futures):
+            path, count, nbytes, errors = future.result()
+            total_bytes += nbytes
+            print(f"{path}: {count} tokens, {len(errors)} errors")
+            for error in errors:
+                print(f"{path}:{error}")
+            if errors:
+                failed += 1
+    elapsed = time.perf_counter() - start
+
+    print()
+    print(f"Files: {len(files)}, with errors: {failed}")
+    print(
+        f"{len(files) / elapsed:.1f} files/sec, "
+        f"{total_bytes / 1e6 / elapsed:.2f} MB/sec"
+    )
+    return failed
+
+
+## EACH FILE IS LEXED IN A WORKER PROCESS AND ITS RESULT IS PRINTED ##
+## AS SOON AS IT COMPLETES, SO OUTPUT ORDER FOLLOWS COMPLETION.     ##
 
 if __name__ == "__main__":
-    lexer = Lexer("test_cases/bad/prog1.txt")
+    parser = argparse.ArgumentParser(description="Logo lexer")
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        help="files, directories or globs to lex in batch mode",
+    )
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="worker processes")
+    parser.add_argument(
+        "--engine",
+        choices=["char", "regex"],
+        default="char",
+        help="scan engine",
+    )
+    args = parser.parse_args()
+
+    if args.paths:
+        sys.exit(1 if run_batch(args.paths, args.jobs, args.engine) else 0)
 
-    token = lexer.scan()
-    while token.tag != Tag.EOF:
-        print(str(token))
-        token = lexer.scan()
+    with Lexer("test_cases/bad/prog1.txt", engine=args.engine) as lexer:
+        for token in lexer:
+            print(str(token))
     print("END")